@@ -11,14 +11,35 @@ from alembic import op
 import sqlalchemy as sa
 from sqlalchemy.dialects import postgresql
 
+from app.migration_helpers import set_lock_timeout, tune_for_ddl
+
 # revision identifiers, used by Alembic.
 revision: str = '001'
 down_revision: Union[str, None] = None
 branch_labels: Union[str, Sequence[str], None] = None
 depends_on: Union[str, Sequence[str], None] = None
 
+# Creates the monthly history_logs partition containing the given date
+CREATE_HISTORY_LOGS_PARTITION_FUNCTION = """
+CREATE OR REPLACE FUNCTION create_history_logs_partition(target_day date) RETURNS void AS $$
+DECLARE
+    month_start date := date_trunc('month', target_day);
+BEGIN
+    EXECUTE format(
+        'CREATE TABLE IF NOT EXISTS %I PARTITION OF history_logs FOR VALUES FROM (%L) TO (%L)',
+        'history_logs_y' || to_char(month_start, 'YYYY') || 'm' || to_char(month_start, 'MM'),
+        month_start,
+        month_start + interval '1 month'
+    );
+END;
+$$ LANGUAGE plpgsql
+"""
+
 
 def upgrade() -> None:
+    set_lock_timeout()
+    tune_for_ddl()
+
     # Create roles table
     op.create_table(
         'roles',
@@ -79,7 +100,6 @@ def upgrade() -> None:
         sa.ForeignKeyConstraint(['project_id'], ['projects.id'], name=op.f('fk_project_stages_project_id_projects')),
         sa.PrimaryKeyConstraint('id', name=op.f('pk_project_stages'))
     )
-    op.create_index(op.f('ix_project_id'), 'project_stages', ['project_id'], unique=False)
     op.create_index('ix_project_stages_project_id_name', 'project_stages', ['project_id', 'name'], unique=False)
 
     # Create defect_statuses table
@@ -101,7 +121,7 @@ def upgrade() -> None:
         sa.Column('stage_id', sa.Integer(), nullable=True),
         sa.Column('title', sa.String(length=255), nullable=False),
         sa.Column('description', sa.Text(), nullable=True),
-        sa.Column('priority', sa.Enum('low', 'medium', 'high', 'critical', name='priorityenum'), nullable=False),
+        sa.Column('priority', sa.SmallInteger(), nullable=False),
         sa.Column('status_id', sa.Integer(), nullable=False),
         sa.Column('created_by', sa.Integer(), nullable=False),
         sa.Column('assigned_to', sa.Integer(), nullable=True),
@@ -109,6 +129,7 @@ def upgrade() -> None:
         sa.Column('created_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.text('now()')),
         sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
         sa.CheckConstraint('length(title) <= 255', name=op.f('ck_defects_title_length')),
+        sa.CheckConstraint('priority BETWEEN 1 AND 4', name=op.f('ck_defects_priority_range')),
         sa.ForeignKeyConstraint(['assigned_to'], ['users.id'], name=op.f('fk_defects_assigned_to_users')),
         sa.ForeignKeyConstraint(['created_by'], ['users.id'], name=op.f('fk_defects_created_by_users')),
         sa.ForeignKeyConstraint(['project_id'], ['projects.id'], name=op.f('fk_defects_project_id_projects')),
@@ -116,19 +137,20 @@ def upgrade() -> None:
         sa.ForeignKeyConstraint(['status_id'], ['defect_statuses.id'], name=op.f('fk_defects_status_id_defect_statuses')),
         sa.PrimaryKeyConstraint('id', name=op.f('pk_defects'))
     )
-    op.create_index(op.f('ix_project_id'), 'defects', ['project_id'], unique=False)
     op.create_index(op.f('ix_stage_id'), 'defects', ['stage_id'], unique=False)
     op.create_index(op.f('ix_status_id'), 'defects', ['status_id'], unique=False)
     op.create_index(op.f('ix_created_by'), 'defects', ['created_by'], unique=False)
-    op.create_index(op.f('ix_assigned_to'), 'defects', ['assigned_to'], unique=False)
-    op.create_index(op.f('ix_priority'), 'defects', ['priority'], unique=False)
     op.create_index(op.f('ix_due_date'), 'defects', ['due_date'], unique=False)
-    op.create_index('ix_defects_project_id_status_id', 'defects', ['project_id', 'status_id'], unique=False)
+    op.create_index(
+        'ix_defects_project_id_status_id_priority', 'defects', ['project_id', 'status_id', 'priority'], unique=False,
+        postgresql_include=['due_date', 'assigned_to']
+    )
+    op.create_index('ix_defects_assigned_to_status_id', 'defects', ['assigned_to', 'status_id'], unique=False)
 
     # Create comments table
     op.create_table(
         'comments',
-        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('id', sa.BigInteger(), sa.Identity(always=False), nullable=False),
         sa.Column('defect_id', sa.Integer(), nullable=False),
         sa.Column('user_id', sa.Integer(), nullable=False),
         sa.Column('text', sa.Text(), nullable=False),
@@ -144,7 +166,7 @@ def upgrade() -> None:
     # Create attachments table
     op.create_table(
         'attachments',
-        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('id', sa.BigInteger(), sa.Identity(always=False), nullable=False),
         sa.Column('defect_id', sa.Integer(), nullable=False),
         sa.Column('file_name', sa.String(length=255), nullable=False),
         sa.Column('file_path', sa.String(length=512), nullable=False),
@@ -157,25 +179,41 @@ def upgrade() -> None:
     )
     op.create_index(op.f('ix_defect_id'), 'attachments', ['defect_id'], unique=False)
     op.create_index(op.f('ix_uploaded_by'), 'attachments', ['uploaded_by'], unique=False)
-    op.create_index(op.f('ix_is_deleted'), 'attachments', ['is_deleted'], unique=False)
+    op.create_index(
+        'ix_attachments_defect_id_active', 'attachments', ['defect_id'], unique=False,
+        postgresql_where=sa.text('is_deleted = false')
+    )
 
-    # Create history_logs table
+    # Create history_logs table, range-partitioned by month on timestamp.
+    # The partition key has to be part of the primary key, and the id uses a
+    # BIGSERIAL sequence because identity columns on partitioned tables need
+    # PostgreSQL 17.
     op.create_table(
         'history_logs',
-        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
         sa.Column('defect_id', sa.Integer(), nullable=False),
         sa.Column('user_id', sa.Integer(), nullable=False),
-        sa.Column('action_type', sa.Enum('CREATE', 'UPDATE', 'STATUS_CHANGE', 'COMMENT_ADDED', name='actiontypeenum'), nullable=False),
+        sa.Column('action_type', sa.SmallInteger(), nullable=False),
         sa.Column('old_value', sa.Text(), nullable=True),
         sa.Column('new_value', sa.Text(), nullable=True),
         sa.Column('timestamp', sa.DateTime(timezone=True), nullable=False, server_default=sa.text('now()')),
+        sa.CheckConstraint('action_type BETWEEN 1 AND 4', name=op.f('ck_history_logs_action_type_range')),
         sa.ForeignKeyConstraint(['defect_id'], ['defects.id'], name=op.f('fk_history_logs_defect_id_defects'), ondelete='CASCADE'),
         sa.ForeignKeyConstraint(['user_id'], ['users.id'], name=op.f('fk_history_logs_user_id_users')),
-        sa.PrimaryKeyConstraint('id', name=op.f('pk_history_logs'))
+        sa.PrimaryKeyConstraint('id', 'timestamp', name=op.f('pk_history_logs')),
+        postgresql_partition_by='RANGE (timestamp)'
     )
-    op.create_index(op.f('ix_defect_id'), 'history_logs', ['defect_id'], unique=False)
+    op.execute(CREATE_HISTORY_LOGS_PARTITION_FUNCTION)
+    # Partitions for the current and the next month; later months are added
+    # by calling create_history_logs_partition() ahead of time (e.g. monthly
+    # from pg_cron). The default partition keeps inserts working if a month
+    # was not created in time.
+    op.execute(
+        "SELECT create_history_logs_partition(CAST(now() AS date)), "
+        "create_history_logs_partition(CAST(now() + interval '1 month' AS date))"
+    )
+    op.execute("CREATE TABLE history_logs_default PARTITION OF history_logs DEFAULT")
     op.create_index(op.f('ix_user_id'), 'history_logs', ['user_id'], unique=False)
-    op.create_index(op.f('ix_action_type'), 'history_logs', ['action_type'], unique=False)
     op.create_index(op.f('ix_timestamp'), 'history_logs', ['timestamp'], unique=False)
     op.create_index('ix_history_logs_defect_id_timestamp', 'history_logs', ['defect_id', 'timestamp'], unique=False)
 
@@ -199,9 +237,12 @@ def upgrade() -> None:
 
 
 def downgrade() -> None:
+    set_lock_timeout()
+
     # Drop tables in reverse order
     op.drop_table('reports')
     op.drop_table('history_logs')
+    op.execute('DROP FUNCTION IF EXISTS create_history_logs_partition(date)')
     op.drop_table('attachments')
     op.drop_table('comments')
     op.drop_table('defects')
@@ -210,7 +251,3 @@ def downgrade() -> None:
     op.drop_table('projects')
     op.drop_table('users')
     op.drop_table('roles')
-    
-    # Drop enum types
-    op.execute('DROP TYPE IF EXISTS actiontypeenum')
-    op.execute('DROP TYPE IF EXISTS priorityenum')
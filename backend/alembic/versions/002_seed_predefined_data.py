@@ -9,8 +9,8 @@ from typing import Sequence, Union
 
 from alembic import op
 import sqlalchemy as sa
-from sqlalchemy.sql import table, column
-from sqlalchemy import String, Text, Integer
+
+from app.migration_helpers import set_lock_timeout
 
 # revision identifiers, used by Alembic.
 revision: str = '002'
@@ -19,93 +19,69 @@ branch_labels: Union[str, Sequence[str], None] = None
 depends_on: Union[str, Sequence[str], None] = None
 
 
+# Predefined roles
+# Requirements: 2.1 - Engineer, Manager, Observer, Admin
+ROLES = [
+    (1, 'Engineer', 'Can create defects, add comments, attach files, and modify their own defects'),
+    (2, 'Manager', 'Can assign executors, change defect statuses, generate reports, and manage projects'),
+    (3, 'Observer', 'Can view projects, defects, and reports without modification rights'),
+    (4, 'Admin', 'Full access to manage users, roles, projects, and security settings'),
+]
+
+# Predefined defect statuses
+# Requirements: 6.1 - New, In Progress, Review, Closed, Canceled
+DEFECT_STATUSES = [
+    (1, 'New', 'Defect has been created and is awaiting assignment'),
+    (2, 'In Progress', 'Defect is currently being worked on'),
+    (3, 'Review', 'Defect fix is complete and awaiting review'),
+    (4, 'Closed', 'Defect has been resolved and verified'),
+    (5, 'Canceled', 'Defect has been canceled and will not be fixed'),
+]
+
+
+def _multi_values_insert(table_name: str, rows) -> sa.TextClause:
+    """
+    Build a single INSERT ... VALUES (...), (...) statement for the given rows.
+
+    All rows are sent in one statement (one round trip) instead of one
+    INSERT per row. Rows that already exist (by id or by unique name) are
+    skipped, so the seed can be re-applied safely. Larger seeds should be
+    loaded with COPY FROM STDIN through the raw DBAPI cursor instead.
+    """
+    values = []
+    params = {}
+    for index, (row_id, name, description) in enumerate(rows):
+        values.append(f"({row_id}, :name_{index}, :description_{index})")
+        params[f"name_{index}"] = name
+        params[f"description_{index}"] = description
+
+    return sa.text(
+        f"INSERT INTO {table_name} (id, name, description) VALUES {', '.join(values)} "
+        "ON CONFLICT DO NOTHING"
+    ).bindparams(**params)
+
+
 def upgrade() -> None:
-    # Define table structures for bulk insert
-    roles_table = table(
-        'roles',
-        column('id', Integer),
-        column('name', String),
-        column('description', Text)
-    )
-    
-    defect_statuses_table = table(
-        'defect_statuses',
-        column('id', Integer),
-        column('name', String),
-        column('description', Text)
-    )
-    
-    # Insert predefined roles
-    # Requirements: 2.1 - Engineer, Manager, Observer, Admin
-    op.bulk_insert(
-        roles_table,
-        [
-            {
-                'id': 1,
-                'name': 'Engineer',
-                'description': 'Can create defects, add comments, attach files, and modify their own defects'
-            },
-            {
-                'id': 2,
-                'name': 'Manager',
-                'description': 'Can assign executors, change defect statuses, generate reports, and manage projects'
-            },
-            {
-                'id': 3,
-                'name': 'Observer',
-                'description': 'Can view projects, defects, and reports without modification rights'
-            },
-            {
-                'id': 4,
-                'name': 'Admin',
-                'description': 'Full access to manage users, roles, projects, and security settings'
-            }
-        ]
-    )
+    set_lock_timeout()
+
+    # Insert predefined roles and defect statuses, one statement per table
+    op.execute(_multi_values_insert('roles', ROLES))
+    op.execute(_multi_values_insert('defect_statuses', DEFECT_STATUSES))
     
-    # Insert predefined defect statuses
-    # Requirements: 6.1 - New, In Progress, Review, Closed, Canceled
-    op.bulk_insert(
-        defect_statuses_table,
-        [
-            {
-                'id': 1,
-                'name': 'New',
-                'description': 'Defect has been created and is awaiting assignment'
-            },
-            {
-                'id': 2,
-                'name': 'In Progress',
-                'description': 'Defect is currently being worked on'
-            },
-            {
-                'id': 3,
-                'name': 'Review',
-                'description': 'Defect fix is complete and awaiting review'
-            },
-            {
-                'id': 4,
-                'name': 'Closed',
-                'description': 'Defect has been resolved and verified'
-            },
-            {
-                'id': 5,
-                'name': 'Canceled',
-                'description': 'Defect has been canceled and will not be fixed'
-            }
-        ]
+    # Move sequences past the highest existing ID (single round trip)
+    op.execute(
+        "SELECT "
+        "setval('roles_id_seq', GREATEST((SELECT COALESCE(MAX(id), 0) FROM roles), 1)), "
+        "setval('defect_statuses_id_seq', GREATEST((SELECT COALESCE(MAX(id), 0) FROM defect_statuses), 1))"
     )
-    
-    # Update sequences to continue from the last inserted ID
-    op.execute("SELECT setval('roles_id_seq', 4, true)")
-    op.execute("SELECT setval('defect_statuses_id_seq', 5, true)")
 
 
 def downgrade() -> None:
+    set_lock_timeout()
+
     # Delete predefined data in reverse order
     op.execute("DELETE FROM defect_statuses WHERE id IN (1, 2, 3, 4, 5)")
     op.execute("DELETE FROM roles WHERE id IN (1, 2, 3, 4)")
     
-    # Reset sequences
-    op.execute("SELECT setval('roles_id_seq', 1, false)")
-    op.execute("SELECT setval('defect_statuses_id_seq', 1, false)")
+    # Reset sequences (single round trip)
+    op.execute("SELECT setval('roles_id_seq', 1, false), setval('defect_statuses_id_seq', 1, false)")
@@ -0,0 +1,44 @@
+"""Store users.email as case-insensitive CITEXT
+
+Revision ID: 003
+Revises: 002
+Create Date: 2024-11-09 12:02:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from app.migration_helpers import set_lock_timeout
+
+# revision identifiers, used by Alembic.
+revision: str = '003'
+down_revision: Union[str, None] = '002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Switch users.email to CITEXT so equality ignores case."""
+    set_lock_timeout()
+    op.execute("CREATE EXTENSION IF NOT EXISTS citext")
+    # Rewrites users and rebuilds uq_users_email, ix_email and ix_users_active_email
+    op.alter_column(
+        'users', 'email',
+        existing_type=sa.String(length=255),
+        type_=postgresql.CITEXT(),
+        existing_nullable=False
+    )
+
+
+def downgrade() -> None:
+    """Restore users.email to VARCHAR(255); the citext extension is left installed."""
+    set_lock_timeout()
+    op.alter_column(
+        'users', 'email',
+        existing_type=postgresql.CITEXT(),
+        type_=sa.String(length=255),
+        existing_nullable=False
+    )
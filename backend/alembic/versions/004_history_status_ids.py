@@ -0,0 +1,82 @@
+"""Store status changes in history_logs as defect_statuses ids
+
+Revision ID: 004
+Revises: 003
+Create Date: 2024-11-09 12:03:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.migration_helpers import create_partitioned_index, set_lock_timeout
+
+# revision identifiers, used by Alembic.
+revision: str = '004'
+down_revision: Union[str, None] = '003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# SmallIntEnum code of ActionTypeEnum.STATUS_CHANGE
+STATUS_CHANGE = 3
+
+
+def upgrade() -> None:
+    """Add old/new status ids and move STATUS_CHANGE entries off the text columns."""
+    set_lock_timeout()
+    op.add_column('history_logs', sa.Column('old_status_id', sa.Integer(), nullable=True))
+    op.add_column('history_logs', sa.Column('new_status_id', sa.Integer(), nullable=True))
+    # Not added NOT VALID: PostgreSQL (before 18) rejects NOT VALID foreign
+    # keys on partitioned tables. The columns were just added and are NULL
+    # in every row, so validation has nothing to look up in defect_statuses.
+    op.create_foreign_key(
+        op.f('fk_history_logs_old_status_id_defect_statuses'),
+        'history_logs', 'defect_statuses', ['old_status_id'], ['id'], ondelete='RESTRICT'
+    )
+    op.create_foreign_key(
+        op.f('fk_history_logs_new_status_id_defect_statuses'),
+        'history_logs', 'defect_statuses', ['new_status_id'], ['id'], ondelete='RESTRICT'
+    )
+
+    # Resolve status names to ids, then clear the text that was resolved;
+    # values that don't name a status are kept as text
+    op.execute(sa.text("""
+        UPDATE history_logs h
+        SET old_status_id = (SELECT id FROM defect_statuses WHERE name = h.old_value),
+            new_status_id = (SELECT id FROM defect_statuses WHERE name = h.new_value)
+        WHERE h.action_type = :status_change
+    """).bindparams(status_change=STATUS_CHANGE))
+    op.execute(sa.text("""
+        UPDATE history_logs
+        SET old_value = CASE WHEN old_status_id IS NULL THEN old_value END,
+            new_value = CASE WHEN new_status_id IS NULL THEN new_value END
+        WHERE action_type = :status_change
+    """).bindparams(status_change=STATUS_CHANGE))
+
+    # Only STATUS_CHANGE entries carry status ids. The indexes serve the
+    # RESTRICT check when a status is deleted and per-status history lookups
+    create_partitioned_index(
+        'ix_history_logs_old_status_id', 'history_logs', ['old_status_id'], where='old_status_id IS NOT NULL'
+    )
+    create_partitioned_index(
+        'ix_history_logs_new_status_id', 'history_logs', ['new_status_id'], where='new_status_id IS NOT NULL'
+    )
+
+
+def downgrade() -> None:
+    """Write status names back into old_value/new_value and drop the id columns."""
+    set_lock_timeout()
+    op.execute(sa.text("""
+        UPDATE history_logs h
+        SET old_value = COALESCE(h.old_value, (SELECT name FROM defect_statuses WHERE id = h.old_status_id)),
+            new_value = COALESCE(h.new_value, (SELECT name FROM defect_statuses WHERE id = h.new_status_id))
+        WHERE h.action_type = :status_change
+    """).bindparams(status_change=STATUS_CHANGE))
+    op.drop_index('ix_history_logs_new_status_id', table_name='history_logs')
+    op.drop_index('ix_history_logs_old_status_id', table_name='history_logs')
+    op.drop_constraint(op.f('fk_history_logs_new_status_id_defect_statuses'), 'history_logs', type_='foreignkey')
+    op.drop_constraint(op.f('fk_history_logs_old_status_id_defect_statuses'), 'history_logs', type_='foreignkey')
+    op.drop_column('history_logs', 'new_status_id')
+    op.drop_column('history_logs', 'old_status_id')
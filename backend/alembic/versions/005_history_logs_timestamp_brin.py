@@ -0,0 +1,36 @@
+"""Replace the history_logs timestamp btree with a BRIN index
+
+Revision ID: 005
+Revises: 004
+Create Date: 2024-11-09 12:04:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from app.migration_helpers import set_lock_timeout
+
+# revision identifiers, used by Alembic.
+revision: str = '005'
+down_revision: Union[str, None] = '004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """history_logs is append-only and time-ordered, which suits BRIN."""
+    set_lock_timeout()
+    # Partitioned parent: CONCURRENTLY is not available, the index cascades
+    # to every partition
+    op.create_index(
+        'ix_history_logs_timestamp_brin', 'history_logs', ['timestamp'], unique=False,
+        postgresql_using='brin', postgresql_with={'pages_per_range': 32}
+    )
+    op.drop_index('ix_timestamp', table_name='history_logs')
+
+
+def downgrade() -> None:
+    set_lock_timeout()
+    op.create_index('ix_timestamp', 'history_logs', ['timestamp'], unique=False)
+    op.drop_index('ix_history_logs_timestamp_brin', table_name='history_logs')
@@ -0,0 +1,29 @@
+"""Drop the redundant defects title length CHECK
+
+Revision ID: 006
+Revises: 005
+Create Date: 2024-11-09 12:05:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from app.migration_helpers import set_lock_timeout
+
+# revision identifiers, used by Alembic.
+revision: str = '006'
+down_revision: Union[str, None] = '005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """title is VARCHAR(255), which already enforces the same limit."""
+    set_lock_timeout()
+    op.drop_constraint(op.f('ck_defects_title_length'), 'defects', type_='check')
+
+
+def downgrade() -> None:
+    set_lock_timeout()
+    op.create_check_constraint(op.f('ck_defects_title_length'), 'defects', 'length(title) <= 255')
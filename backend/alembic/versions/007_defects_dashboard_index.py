@@ -0,0 +1,35 @@
+"""Extend the defects dashboard index with due_date
+
+Revision ID: 007
+Revises: 006
+Create Date: 2024-11-09 12:06:00.000000
+
+"""
+from typing import Sequence, Union
+
+from app.migration_helpers import create_index_concurrently, drop_index_concurrently, set_lock_timeout
+
+# revision identifiers, used by Alembic.
+revision: str = '007'
+down_revision: Union[str, None] = '006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Match the dashboard filter and sort order so the list view can use an index-only scan."""
+    set_lock_timeout()
+    create_index_concurrently(
+        'ix_defects_project_status_priority_due', 'defects', ['project_id', 'status_id', 'priority', 'due_date'],
+        postgresql_include=['title', 'assigned_to']
+    )
+    drop_index_concurrently('ix_defects_project_id_status_id_priority', 'defects')
+
+
+def downgrade() -> None:
+    set_lock_timeout()
+    create_index_concurrently(
+        'ix_defects_project_id_status_id_priority', 'defects', ['project_id', 'status_id', 'priority'],
+        postgresql_include=['due_date', 'assigned_to']
+    )
+    drop_index_concurrently('ix_defects_project_status_priority_due', 'defects')
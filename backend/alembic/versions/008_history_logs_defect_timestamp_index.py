@@ -0,0 +1,36 @@
+"""Replace the history_logs (defect_id, timestamp) index with a covering DESC index
+
+Revision ID: 008
+Revises: 007
+Create Date: 2024-11-09 12:07:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from app.migration_helpers import create_partitioned_index, set_lock_timeout
+
+# revision identifiers, used by Alembic.
+revision: str = '008'
+down_revision: Union[str, None] = '007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """The defect timeline reads newest entries first and only needs action_type and user_id."""
+    set_lock_timeout()
+    create_partitioned_index(
+        'ix_history_logs_defect_timestamp_desc', 'history_logs', ['defect_id', 'timestamp DESC'],
+        include=['action_type', 'user_id']
+    )
+    # A partitioned index cannot be dropped CONCURRENTLY; DROP INDEX only
+    # holds its lock for the catalog change
+    op.drop_index('ix_history_logs_defect_id_timestamp', table_name='history_logs')
+
+
+def downgrade() -> None:
+    set_lock_timeout()
+    create_partitioned_index('ix_history_logs_defect_id_timestamp', 'history_logs', ['defect_id', 'timestamp'])
+    op.drop_index('ix_history_logs_defect_timestamp_desc', table_name='history_logs')
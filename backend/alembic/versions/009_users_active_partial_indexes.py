@@ -0,0 +1,34 @@
+"""Replace the users is_active index with partial indexes on active users
+
+Revision ID: 009
+Revises: 008
+Create Date: 2024-11-09 12:08:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.migration_helpers import create_index_concurrently, drop_index_concurrently, set_lock_timeout
+
+# revision identifiers, used by Alembic.
+revision: str = '009'
+down_revision: Union[str, None] = '008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Login and user listings filter on is_active, which is too unselective to index on its own."""
+    set_lock_timeout()
+    create_index_concurrently('ix_users_active_email', 'users', ['email'], postgresql_where=sa.text('is_active'))
+    create_index_concurrently('ix_users_active_role', 'users', ['role_id'], postgresql_where=sa.text('is_active'))
+    drop_index_concurrently(op.f('ix_is_active'), 'users')
+
+
+def downgrade() -> None:
+    set_lock_timeout()
+    create_index_concurrently(op.f('ix_is_active'), 'users', ['is_active'])
+    drop_index_concurrently('ix_users_active_role', 'users')
+    drop_index_concurrently('ix_users_active_email', 'users')
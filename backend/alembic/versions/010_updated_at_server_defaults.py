@@ -0,0 +1,34 @@
+"""Default updated_at to now() on users, projects and defects
+
+Revision ID: 010
+Revises: 009
+Create Date: 2024-11-09 12:09:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.migration_helpers import set_lock_timeout
+
+# revision identifiers, used by Alembic.
+revision: str = '010'
+down_revision: Union[str, None] = '009'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ('users', 'projects', 'defects')
+
+
+def upgrade() -> None:
+    """The models set updated_at in SQL; new rows get the same server-side value as created_at."""
+    set_lock_timeout()
+    for table in TABLES:
+        op.alter_column(table, 'updated_at', server_default=sa.text('now()'))
+
+
+def downgrade() -> None:
+    set_lock_timeout()
+    for table in TABLES:
+        op.alter_column(table, 'updated_at', server_default=None)
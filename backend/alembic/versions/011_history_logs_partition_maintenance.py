@@ -0,0 +1,88 @@
+"""Move rows out of the default partition when creating a history_logs partition
+
+Revision ID: 011
+Revises: 010
+Create Date: 2024-11-09 12:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from app.migration_helpers import set_lock_timeout
+
+# revision identifiers, used by Alembic.
+revision: str = '011'
+down_revision: Union[str, None] = '010'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Creates the monthly history_logs partition containing the given date. Rows
+# of that month already stored in history_logs_default would make CREATE
+# TABLE ... PARTITION OF fail, so the default partition is detached, the rows
+# are moved into the new partition and the default partition is reattached.
+# Every app worker calls this (see app.main), so callers are serialized.
+CREATE_HISTORY_LOGS_PARTITION_FUNCTION = """
+CREATE OR REPLACE FUNCTION create_history_logs_partition(target_day date) RETURNS void AS $$
+DECLARE
+    month_start date := date_trunc('month', target_day);
+    month_end date := month_start + interval '1 month';
+    partition_name text := 'history_logs_y' || to_char(month_start, 'YYYY') || 'm' || to_char(month_start, 'MM');
+    create_partition text := format(
+        'CREATE TABLE %I PARTITION OF history_logs FOR VALUES FROM (%L) TO (%L)',
+        partition_name, month_start, month_end
+    );
+BEGIN
+    PERFORM pg_advisory_xact_lock(hashtext('create_history_logs_partition'));
+    IF to_regclass(partition_name) IS NOT NULL THEN
+        RETURN;
+    END IF;
+
+    IF to_regclass('history_logs_default') IS NULL
+       OR NOT EXISTS (
+           SELECT 1 FROM history_logs_default
+           WHERE "timestamp" >= month_start AND "timestamp" < month_end
+       ) THEN
+        EXECUTE create_partition;
+        RETURN;
+    END IF;
+
+    ALTER TABLE history_logs DETACH PARTITION history_logs_default;
+    EXECUTE create_partition;
+    WITH moved AS (
+        DELETE FROM history_logs_default
+        WHERE "timestamp" >= month_start AND "timestamp" < month_end
+        RETURNING *
+    )
+    INSERT INTO history_logs SELECT * FROM moved;
+    ALTER TABLE history_logs ATTACH PARTITION history_logs_default DEFAULT;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+# The function as created by 001
+PREVIOUS_HISTORY_LOGS_PARTITION_FUNCTION = """
+CREATE OR REPLACE FUNCTION create_history_logs_partition(target_day date) RETURNS void AS $$
+DECLARE
+    month_start date := date_trunc('month', target_day);
+BEGIN
+    EXECUTE format(
+        'CREATE TABLE IF NOT EXISTS %I PARTITION OF history_logs FOR VALUES FROM (%L) TO (%L)',
+        'history_logs_y' || to_char(month_start, 'YYYY') || 'm' || to_char(month_start, 'MM'),
+        month_start,
+        month_start + interval '1 month'
+    );
+END;
+$$ LANGUAGE plpgsql
+"""
+
+
+def upgrade() -> None:
+    """Rows logged before their month's partition existed no longer block creating it."""
+    set_lock_timeout()
+    op.execute(CREATE_HISTORY_LOGS_PARTITION_FUNCTION)
+
+
+def downgrade() -> None:
+    set_lock_timeout()
+    op.execute(PREVIOUS_HISTORY_LOGS_PARTITION_FUNCTION)
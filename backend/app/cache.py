@@ -0,0 +1,102 @@
+"""
+In-process cache for the reference tables.
+
+defect_statuses and roles hold a handful of predefined rows that are read on
+nearly every request and change only through admin actions. Their {id: name}
+maps are loaded once and served from memory; a commit that writes a
+DefectStatus or Role drops the cached maps so the next lookup reloads them.
+
+Invalidation only sees ORM writes committed in this process. Core
+insert()/update() statements, raw SQL and other uvicorn workers never
+invalidate the cache, so cached maps also expire after CACHE_TTL seconds.
+"""
+
+import time
+from typing import Dict, Tuple
+
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models import DefectStatus, Role
+
+# Lookup statements, built once at import time
+_STATUS_NAMES = select(DefectStatus.id, DefectStatus.name)
+_ROLE_NAMES = select(Role.id, Role.name)
+
+# Seconds a loaded map is served before it is reloaded
+CACHE_TTL = 300.0
+
+# Cached maps by table name: (expiry time, {id: name})
+_maps: Dict[str, Tuple[float, Dict[int, str]]] = {}
+
+# Bumped by invalidate(); a load that started before an invalidation is
+# returned to its caller but not stored
+_generation = 0
+
+
+async def _get(session: AsyncSession, table: str, statement) -> Dict[int, str]:
+    """Return the cached {id: name} map of table, loading it with statement if missing or expired."""
+    cached = _maps.get(table)
+    if cached is not None and cached[0] > time.monotonic():
+        return cached[1]
+    generation = _generation
+    names = dict((await session.execute(statement)).all())
+    if generation == _generation:
+        _maps[table] = (time.monotonic() + CACHE_TTL, names)
+    return names
+
+
+async def get_defect_statuses(session: AsyncSession) -> Dict[int, str]:
+    """
+    Return the defect status names keyed by id, loading them on first use.
+    
+    Args:
+        session: Session used only when the cache is empty or expired
+    
+    Returns:
+        dict: {status_id: status_name}
+    """
+    return await _get(session, "defect_statuses", _STATUS_NAMES)
+
+
+async def get_roles(session: AsyncSession) -> Dict[int, str]:
+    """
+    Return the role names keyed by id, loading them on first use.
+    
+    Args:
+        session: Session used only when the cache is empty or expired
+    
+    Returns:
+        dict: {role_id: role_name}
+    """
+    return await _get(session, "roles", _ROLE_NAMES)
+
+
+def invalidate() -> None:
+    """Drop the cached reference data; the next lookup reloads it."""
+    global _generation
+    _generation += 1
+    _maps.clear()
+
+
+@event.listens_for(Session, "after_flush")
+def _track_reference_writes(session: Session, flush_context) -> None:
+    """Remember that this transaction wrote a DefectStatus or Role."""
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, (DefectStatus, Role)):
+            session.info["reference_data_changed"] = True
+            return
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_commit(session: Session) -> None:
+    """Invalidate the cache once reference-table writes are committed."""
+    if session.info.pop("reference_data_changed", False):
+        invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_reference_writes(session: Session) -> None:
+    """Rolled-back writes never reached the table; nothing to invalidate."""
+    session.info.pop("reference_data_changed", None)
@@ -6,18 +6,25 @@ for database sessions throughout the application.
 """
 
 import os
-from typing import Generator
+from contextvars import ContextVar
+from typing import AsyncGenerator, Optional
 
-from sqlalchemy import create_engine, MetaData
-from sqlalchemy.orm import sessionmaker, Session, DeclarativeBase
+from sqlalchemy import MetaData, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import DeclarativeBase
 
 
 # Database URL from environment variable
+# This is the synchronous URL, also used by Alembic migrations
 DATABASE_URL = os.getenv(
     "DATABASE_URL",
     "postgresql://postgres:postgres@db:5432/frame1_db"
 )
 
+# The application talks to the database through the asyncpg driver
+ASYNC_DATABASE_URL = make_url(DATABASE_URL).set(drivername="postgresql+asyncpg")
+
 # Naming convention for constraints
 # This ensures consistent naming across the database schema
 convention = {
@@ -38,63 +45,143 @@ class Base(DeclarativeBase):
     metadata = metadata
 
 
-# Create SQLAlchemy engine
-# echo=True enables SQL query logging (useful for development)
-engine = create_engine(
-    DATABASE_URL,
-    echo=True,
+# SQL query logging is off by default; set SQL_ECHO=true for development
+SQL_ECHO = os.getenv("SQL_ECHO", "").lower() == "true"
+
+# Connection pool size, should roughly match the number of concurrent workers
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "20"))
+
+# Create SQLAlchemy async engine
+engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    echo=SQL_ECHO,
+    echo_pool=False,
     pool_pre_ping=True,  # Verify connections before using them
-    pool_size=5,  # Connection pool size
-    max_overflow=10  # Maximum overflow connections
+    pool_size=DB_POOL_SIZE,  # Connection pool size
+    max_overflow=10,  # Maximum overflow connections
+    pool_recycle=1800,  # Recycle connections after 30 minutes
+    pool_use_lifo=True  # Reuse the most recently returned connection first
 )
 
 # Create session factory
-# autocommit=False: Transactions must be explicitly committed
 # autoflush=False: Changes are not automatically flushed to the database
-SessionLocal = sessionmaker(
-    autocommit=False,
+# expire_on_commit=False: Loaded attributes stay usable after commit
+# (async sessions cannot lazily refresh expired attributes)
+SessionLocal = async_sessionmaker(
+    engine,
     autoflush=False,
-    bind=engine
+    expire_on_commit=False
 )
 
 
-def get_db() -> Generator[Session, None, None]:
+class LazySession:
+    """
+    Stand-in for an AsyncSession that is only created on first use.
+    
+    Attribute access is forwarded to the underlying AsyncSession, which is
+    created from SessionLocal the first time it is needed. Requests that
+    never touch the database never construct a session.
+    """
+    
+    def __init__(self):
+        self._session: Optional[AsyncSession] = None
+    
+    @property
+    def session(self) -> AsyncSession:
+        """The underlying AsyncSession, created on first access."""
+        if self._session is None:
+            self._session = SessionLocal()
+        return self._session
+    
+    def __getattr__(self, name: str):
+        return getattr(self.session, name)
+    
+    # Dunder methods bypass __getattr__, so the context manager protocol of
+    # AsyncSession is implemented here; entering does not create the session
+    async def __aenter__(self) -> "LazySession":
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+    
+    async def close(self) -> None:
+        """Close the underlying session if one was created."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+
+# Database handle of the request being served, set by get_db()
+_session_ctx: ContextVar[Optional[LazySession]] = ContextVar("db_session", default=None)
+
+
+def current_db() -> Optional[LazySession]:
+    """
+    Return the database handle of the current request, if any.
+    
+    Allows helpers that are not wired through Depends() to reuse the
+    request's session instead of opening their own.
+    """
+    return _session_ctx.get()
+
+
+async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """
     Dependency injection function for database sessions.
     
-    Yields a database session and ensures it's closed after use.
+    Yields a lazily created async database session and ensures it's closed
+    after use. The session (and its pooled connection) is only created when
+    the handler first uses it.
+    
+    There is one session per request: if a session is already active in the
+    current context (e.g. a sub-dependency declared with use_cache=False),
+    it is shared instead of opening a second session, connection and
+    transaction. Only the outermost get_db() closes it.
     This function is designed to be used with FastAPI's Depends().
     
     Usage:
         @app.get("/items")
-        def read_items(db: Session = Depends(get_db)):
-            return db.query(Item).all()
+        async def read_items(db: AsyncSession = Depends(get_db)):
+            result = await db.execute(select(Item))
+            return result.scalars().all()
     
     Yields:
-        Session: SQLAlchemy database session
+        AsyncSession: SQLAlchemy async database session (as a LazySession)
     """
-    db = SessionLocal()
+    active = _session_ctx.get()
+    if active is not None:
+        yield active
+        return
+    
+    db = LazySession()
+    token = _session_ctx.set(db)
     try:
         yield db
     finally:
-        db.close()
+        _session_ctx.reset(token)
+        await db.close()
 
 
-def create_tables():
+async def create_tables():
     """
     Create all tables in the database.
     
     This function should be called during application startup
-    to ensure all tables exist. In production, use Alembic migrations instead.
+    to ensure all tables exist. In production, use Alembic migrations instead
+    (history_logs in particular is only partitioned by the migrations).
     """
-    Base.metadata.create_all(bind=engine)
+    async with engine.begin() as conn:
+        # users.email is CITEXT (see migration 003)
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS citext"))
+        await conn.run_sync(Base.metadata.create_all)
 
 
-def drop_tables():
+async def drop_tables():
     """
     Drop all tables from the database.
     
     WARNING: This will delete all data. Use with caution.
     Primarily intended for testing and development.
     """
-    Base.metadata.drop_all(bind=engine)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
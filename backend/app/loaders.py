@@ -0,0 +1,147 @@
+"""
+Batch loaders for per-defect child counts.
+
+Rendering a list of defects with their comment, attachment and history counts
+would otherwise cost one COUNT query per defect and relationship. A
+CountLoader collects the defect ids requested while the event loop runs the
+callers, then resolves all of them with a single
+SELECT defect_id, count(*) ... WHERE defect_id IN (...) GROUP BY defect_id.
+
+Loaders are cached on the session, so each request (one session per request,
+see app.database.get_db) gets its own loaders and results are never shared
+between requests. A session runs one statement at a time, so all loaders of a
+session take turns through a shared lock; gathering several loaders still
+costs one query per loader, issued one after another.
+
+Usage:
+    counts = await comment_counts(db).load_many([d.id for d in defects])
+"""
+
+import asyncio
+from typing import Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import current_db
+from app.models import Attachment, Comment, HistoryLog
+
+
+class CountLoader:
+    """
+    Batches per-defect row counts of one child table into one GROUP BY query.
+
+    load() calls made in the same event loop iteration are dispatched
+    together; counts are memoized for the lifetime of the loader.
+    """
+
+    def __init__(self, session: AsyncSession, defect_id_column, *criteria):
+        self._session = session
+        # Shared by every loader of the session: AsyncSession is not safe for
+        # concurrent execute() calls
+        self._lock: asyncio.Lock = session.info.setdefault("count_loader_lock", asyncio.Lock())
+        self._column = defect_id_column
+        self._criteria = criteria
+        self._counts: Dict[int, int] = {}
+        self._pending: Dict[int, asyncio.Future] = {}
+        # Running dispatch tasks; the event loop only keeps weak references
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def load(self, defect_id: int) -> int:
+        """
+        Return the number of child rows of one defect.
+
+        Args:
+            defect_id: ID of the defect
+
+        Returns:
+            int: Row count (0 when the defect has none)
+        """
+        if defect_id in self._counts:
+            return self._counts[defect_id]
+
+        future = self._pending.get(defect_id)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            if not self._pending:
+                # First id of a new batch: dispatch once the other callers
+                # have queued their ids (see _dispatch)
+                task = loop.create_task(self._dispatch())
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+            future = loop.create_future()
+            self._pending[defect_id] = future
+        return await future
+
+    async def load_many(self, defect_ids: Iterable[int]) -> List[int]:
+        """
+        Return the child row counts of several defects with one query.
+
+        Args:
+            defect_ids: IDs of the defects
+
+        Returns:
+            list: Row counts in the order of defect_ids
+        """
+        return list(await asyncio.gather(*(self.load(defect_id) for defect_id in defect_ids)))
+
+    async def _dispatch(self) -> None:
+        """Resolve every pending id with a single grouped count."""
+        # Let callers scheduled behind this task (e.g. a load_many() inside a
+        # gather()) queue their ids: wait until a loop iteration adds none
+        queued = -1
+        while queued != len(self._pending):
+            queued = len(self._pending)
+            await asyncio.sleep(0)
+
+        async with self._lock:
+            # Taken once the session is free, so ids queued while waiting join the batch
+            pending, self._pending = self._pending, {}
+            statement = (
+                select(self._column, func.count())
+                .where(self._column.in_(list(pending)), *self._criteria)
+                .group_by(self._column)
+            )
+            try:
+                counts = dict((await self._session.execute(statement)).all())
+            except Exception as e:
+                for future in pending.values():
+                    if not future.done():
+                        future.set_exception(e)
+                return
+
+        for defect_id, future in pending.items():
+            count = counts.get(defect_id, 0)
+            self._counts[defect_id] = count
+            if not future.done():
+                future.set_result(count)
+
+
+def _loader(session: Optional[AsyncSession], key: str, defect_id_column, *criteria) -> CountLoader:
+    """Return the session's loader for key, creating it on first use."""
+    if session is None:
+        session = current_db()
+        if session is None:
+            raise RuntimeError(
+                "No database session in the current context; "
+                "pass a session explicitly outside of a request"
+            )
+    loaders = session.info.setdefault("count_loaders", {})
+    if key not in loaders:
+        loaders[key] = CountLoader(session, defect_id_column, *criteria)
+    return loaders[key]
+
+
+def comment_counts(session: Optional[AsyncSession] = None) -> CountLoader:
+    """Comment counts per defect (defaults to the current request's session)."""
+    return _loader(session, "comments", Comment.defect_id)
+
+
+def attachment_counts(session: Optional[AsyncSession] = None) -> CountLoader:
+    """Counts of non-deleted attachments per defect."""
+    return _loader(session, "attachments", Attachment.defect_id, Attachment.is_deleted.is_(False))
+
+
+def history_counts(session: Optional[AsyncSession] = None) -> CountLoader:
+    """History log entry counts per defect."""
+    return _loader(session, "history_logs", HistoryLog.defect_id)
@@ -5,13 +5,18 @@ This module initializes the FastAPI application, sets up database connections,
 and configures startup/shutdown event handlers.
 """
 
-from contextlib import asynccontextmanager
+import asyncio
+import os
+from contextlib import asynccontextmanager, suppress
 
 from fastapi import FastAPI, Depends
-from sqlalchemy.orm import Session
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
 
 # Import database configuration and session dependency
-from app.database import create_tables, get_db
+from app.cache import get_defect_statuses, get_roles
+from app.database import SessionLocal, create_tables, engine, get_db
 
 # Import all models to ensure they are registered with SQLAlchemy
 from app.models import (
@@ -30,6 +35,58 @@ from app.models import (
     ActionTypeEnum,
 )
 
+# Connectivity probe used by the health check, built once at import time
+_PING = text("SELECT 1")
+
+# Create tables on startup only when explicitly enabled (development);
+# otherwise the schema is managed by Alembic migrations
+AUTO_CREATE_TABLES = os.getenv("AUTO_CREATE_TABLES") == "1"
+
+# Ensures the history_logs partitions of this and next month exist
+# (create_history_logs_partition() is defined by the migrations)
+_CREATE_HISTORY_LOGS_PARTITIONS = text(
+    "SELECT create_history_logs_partition(CAST(now() AS date)), "
+    "create_history_logs_partition(CAST(now() + interval '1 month' AS date))"
+)
+
+# How often the partition check runs, in seconds
+PARTITION_CHECK_INTERVAL = 24 * 60 * 60
+
+
+async def load_reference_data() -> None:
+    """
+    Warm the reference-data cache (see app.cache).
+    
+    defect_statuses and roles hold a handful of predefined rows, so handlers
+    resolve names through app.cache.get_defect_statuses() and get_roles()
+    ({id: name}) instead of joining these tables.
+    """
+    async with SessionLocal() as session:
+        await get_defect_statuses(session)
+        await get_roles(session)
+
+
+async def create_history_logs_partitions() -> None:
+    """
+    Create the history_logs partitions for this and next month if missing.
+    
+    Rows written before their month's partition exists land in
+    history_logs_default; creating the partition moves them over.
+    """
+    async with SessionLocal() as session:
+        await session.execute(_CREATE_HISTORY_LOGS_PARTITIONS)
+        await session.commit()
+
+
+async def maintain_history_logs_partitions() -> None:
+    """Run create_history_logs_partitions() now and then every PARTITION_CHECK_INTERVAL seconds."""
+    while True:
+        try:
+            await create_history_logs_partitions()
+        except (SQLAlchemyError, OSError) as e:
+            print(f"history_logs partitions not created: {e}")
+        await asyncio.sleep(PARTITION_CHECK_INTERVAL)
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -37,19 +94,43 @@ async def lifespan(app: FastAPI):
     Lifespan context manager for application startup and shutdown events.
     
     On startup:
-    - Creates all database tables (for development)
-    - In production, use Alembic migrations instead
+    - Creates all database tables when AUTO_CREATE_TABLES=1 (for development)
+    - Otherwise the schema is expected to be managed by Alembic migrations
+    - Warms the defect status and role cache
+    - Starts the daily history_logs partition check (migrated schema only;
+      tables from create_all are not partitioned)
     
     On shutdown:
-    - Cleanup operations can be added here if needed
+    - Stops the partition check
+    - Closes all pooled database connections
     """
-    # Startup: Create all tables
-    create_tables()
-    print("Database tables created successfully")
+    # Startup: Create all tables (development only)
+    if AUTO_CREATE_TABLES:
+        await create_tables()
+        print("Database tables created successfully")
+    
+    # Startup: Cache lookup tables (loaded on first use if this fails,
+    # e.g. before migrations have been applied)
+    try:
+        await load_reference_data()
+    except (SQLAlchemyError, OSError) as e:
+        print(f"Reference data not loaded: {e}")
+    
+    # Startup: Keep next month's history_logs partition ahead of the inserts
+    partitions_task = None
+    if not AUTO_CREATE_TABLES:
+        partitions_task = asyncio.create_task(maintain_history_logs_partitions())
     
     yield
     
-    # Shutdown: Add cleanup operations here if needed
+    # Shutdown: Stop the partition check
+    if partitions_task is not None:
+        partitions_task.cancel()
+        with suppress(asyncio.CancelledError):
+            await partitions_task
+    
+    # Shutdown: Release pooled connections
+    await engine.dispose()
     print("Application shutdown")
 
 
@@ -74,7 +155,7 @@ def read_root():
 
 
 @app.get("/health")
-def health_check(db: Session = Depends(get_db)):
+async def health_check(db: AsyncSession = Depends(get_db)):
     """
     Health check endpoint that verifies database connectivity.
     
@@ -86,7 +167,7 @@ def health_check(db: Session = Depends(get_db)):
     """
     try:
         # Simple query to verify database connection
-        db.execute("SELECT 1")
+        (await db.execute(_PING)).scalar()
         return {
             "status": "healthy",
             "database": "connected"
@@ -0,0 +1,174 @@
+"""
+Helpers shared by Alembic migration scripts.
+
+Migrations that touch existing tables should take locks briefly and fail fast
+instead of queueing behind (and blocking) production traffic. New indexes on
+existing tables must be built with create_index_concurrently() so writes are
+not blocked while the index is built; on partitioned tables, use
+create_partitioned_index().
+"""
+
+import re
+from typing import Sequence
+
+import sqlalchemy as sa
+from alembic import context, op
+
+# Values interpolated into SET statements (SET does not take bind parameters)
+_DURATION = re.compile(r"\d+(us|ms|s|min|h|d)?")
+_MEMORY = re.compile(r"\d+(B|kB|MB|GB|TB)?")
+
+
+def _check_setting(name: str, value: str, pattern: re.Pattern) -> str:
+    """Return value if it is a plain number with an optional unit, else raise ValueError."""
+    if not pattern.fullmatch(value):
+        raise ValueError(f"Invalid {name} value: {value!r}")
+    return value
+
+
+def set_lock_timeout(timeout: str = "2s") -> None:
+    """
+    Limit how long statements of the current migration wait for a lock.
+    
+    Uses SET LOCAL, so the setting only lasts until the migration's
+    transaction ends. Call it at the top of upgrade() and downgrade().
+    An autocommit block ends that transaction; the concurrent index helpers
+    below set the timeout again afterwards.
+    
+    Args:
+        timeout: PostgreSQL duration, e.g. "2s" or "500ms"
+    
+    Raises:
+        ValueError: If timeout is not a number with an optional time unit
+    """
+    timeout = _check_setting("lock_timeout", timeout, _DURATION)
+    op.execute(f"SET LOCAL lock_timeout = '{timeout}'")
+
+
+def tune_for_ddl(maintenance_work_mem: str = "256MB") -> None:
+    """
+    Apply transaction-local settings that speed up schema-heavy migrations.
+    
+    - jit = off: catalog queries issued by DDL are too short to benefit from
+      JIT compilation
+    - synchronous_commit = off: do not wait for the WAL flush at commit
+    - maintenance_work_mem: more memory for CREATE INDEX sorts
+    
+    Uses SET LOCAL, so server settings are restored when the migration's
+    transaction ends.
+    """
+    op.execute("SET LOCAL jit = off")
+    op.execute("SET LOCAL synchronous_commit = off")
+    maintenance_work_mem = _check_setting("maintenance_work_mem", maintenance_work_mem, _MEMORY)
+    op.execute(f"SET LOCAL maintenance_work_mem = '{maintenance_work_mem}'")
+
+
+def _autocommit(lock_timeout: str, statement) -> None:
+    """
+    Run statement() outside the migration transaction.
+    
+    The autocommit block commits the migration's transaction, which discards
+    its SET LOCAL settings, so lock_timeout is set for the session around the
+    statement and set again (locally) for the transaction Alembic opens after
+    the block.
+    """
+    lock_timeout = _check_setting("lock_timeout", lock_timeout, _DURATION)
+    with op.get_context().autocommit_block():
+        op.execute(f"SET lock_timeout = '{lock_timeout}'")
+        try:
+            statement()
+        finally:
+            op.execute("RESET lock_timeout")
+    set_lock_timeout(lock_timeout)
+
+
+def create_index_concurrently(index_name: str, table_name: str, columns: Sequence[str],
+                              lock_timeout: str = "2s", **kw) -> None:
+    """
+    Create an index with CREATE INDEX CONCURRENTLY IF NOT EXISTS.
+    
+    CONCURRENTLY cannot run inside a transaction block, so the statement is
+    issued in an autocommit block. Extra keyword arguments are passed to
+    op.create_index() (e.g. unique=True, postgresql_where=...).
+    
+    A build that fails (e.g. on lock_timeout) leaves an INVALID index behind
+    that IF NOT EXISTS will not rebuild; drop it before retrying.
+    """
+    _autocommit(lock_timeout, lambda: op.create_index(
+        index_name,
+        table_name,
+        list(columns),
+        if_not_exists=True,
+        postgresql_concurrently=True,
+        **kw
+    ))
+
+
+def drop_index_concurrently(index_name: str, table_name: str, lock_timeout: str = "2s") -> None:
+    """Drop an index with DROP INDEX CONCURRENTLY IF EXISTS."""
+    _autocommit(lock_timeout, lambda: op.drop_index(
+        index_name,
+        table_name=table_name,
+        if_exists=True,
+        postgresql_concurrently=True
+    ))
+
+
+def create_partitioned_index(index_name: str, table_name: str, columns: Sequence[str],
+                             include: Sequence[str] = (), where: str | None = None,
+                             lock_timeout: str = "2s") -> None:
+    """
+    Create an index on a partitioned table without blocking writes for the build.
+    
+    PostgreSQL cannot build an index on a partitioned table CONCURRENTLY.
+    Instead the index is created ON ONLY the parent (a catalog change; the
+    index stays invalid), each partition's index is built with
+    create_index_concurrently() and attached, and the parent index becomes
+    valid once every partition has been attached. Partitions created later
+    get a matching index automatically.
+    
+    Listing the partitions needs a database connection, so in offline (--sql)
+    mode this falls back to a plain CREATE INDEX on the parent, which blocks
+    writes while it builds.
+    
+    Args:
+        index_name: Name of the index on the parent table
+        table_name: Partitioned table
+        columns: Column SQL, e.g. ["defect_id", "timestamp DESC"]
+        include: Non-key columns for INCLUDE
+        where: Predicate SQL for a partial index
+        lock_timeout: Lock timeout for each step
+    """
+    if context.is_offline_mode():
+        op.create_index(
+            index_name,
+            table_name,
+            [sa.text(column) for column in columns],
+            if_not_exists=True,
+            postgresql_include=list(include),
+            postgresql_where=sa.text(where) if where else None
+        )
+        return
+    
+    include_sql = f" INCLUDE ({', '.join(include)})" if include else ""
+    where_sql = f" WHERE {where}" if where else ""
+    op.execute(
+        f"CREATE INDEX IF NOT EXISTS {index_name} ON ONLY {table_name} ({', '.join(columns)}){include_sql}{where_sql}"
+    )
+    
+    partitions = op.get_bind().execute(
+        sa.text("SELECT inhrelid::regclass::text FROM pg_inherits WHERE inhparent = CAST(:table AS regclass)"),
+        {"table": table_name}
+    ).scalars().all()
+    suffix = index_name.removeprefix(f"ix_{table_name}_")
+    for partition in partitions:
+        partition_index = f"{partition}_{suffix}_idx"
+        create_index_concurrently(
+            partition_index,
+            partition,
+            [sa.text(column) for column in columns],
+            lock_timeout=lock_timeout,
+            postgresql_include=list(include),
+            postgresql_where=sa.text(where) if where else None
+        )
+        op.execute(f"ALTER INDEX {index_name} ATTACH PARTITION {partition_index}")
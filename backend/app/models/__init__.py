@@ -4,9 +4,16 @@ Models package for the defect management system.
 This module exports all model classes, the Base class, and enum types
 for convenient importing throughout the application.
 
+All model modules are imported eagerly: relationships reference each other
+by class name, so every mapped class has to be registered before the mappers
+can be configured, and Alembic relies on importing Base from here to see the
+full metadata.
+
 Requirements: All model requirements
 """
 
+from sqlalchemy.orm import configure_mappers
+
 # Base class
 from app.models.base import Base
 
@@ -17,7 +24,7 @@ from app.models.user import Role, User
 from app.models.project import Project, ProjectStage
 
 # Defect models and enums
-from app.models.defect import DefectStatus, Defect, PriorityEnum, ActionTypeEnum
+from app.models.defect import DefectStatus, Defect, PriorityEnum, ActionTypeEnum, defect_list_loaders, defect_report_select
 
 # Comment model
 from app.models.comment import Comment
@@ -31,6 +38,9 @@ from app.models.history import HistoryLog
 # Report model
 from app.models.report import Report
 
+# Resolve all relationships once at import time instead of on the first query
+configure_mappers()
+
 __all__ = [
     # Base
     "Base",
@@ -54,4 +64,7 @@ __all__ = [
     # Enums
     "PriorityEnum",
     "ActionTypeEnum",
+    # Query helpers
+    "defect_list_loaders",
+    "defect_report_select",
 ]
@@ -5,10 +5,10 @@ This module defines the Attachment model with its relationships,
 constraints, and indexes as specified in the requirements.
 """
 
-from datetime import datetime, timezone
+from datetime import datetime
 from typing import TYPE_CHECKING
 
-from sqlalchemy import Integer, String, DateTime, ForeignKey, Boolean
+from sqlalchemy import BigInteger, Identity, Integer, String, DateTime, ForeignKey, Boolean, Index, func, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import Base
@@ -30,8 +30,12 @@ class Attachment(Base):
     """
     __tablename__ = "attachments"
     
-    # Primary key
-    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    # Primary key (BIGINT identity; plain INTEGER on SQLite so it stays a rowid alias)
+    id: Mapped[int] = mapped_column(
+        BigInteger().with_variant(Integer, "sqlite"),
+        Identity(),
+        primary_key=True
+    )
     
     # Foreign keys
     defect_id: Mapped[int] = mapped_column(
@@ -53,12 +57,13 @@ class Attachment(Base):
     file_path: Mapped[str] = mapped_column(String(512), nullable=False)
     
     # Soft delete flag
-    is_deleted: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False, index=True)
+    # Not indexed on its own; see the partial index in __table_args__
+    is_deleted: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
     
     # Timestamp
     uploaded_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
-        default=lambda: datetime.now(timezone.utc),
+        server_default=func.now(),
         nullable=False
     )
     
@@ -66,13 +71,23 @@ class Attachment(Base):
     defect: Mapped["Defect"] = relationship(
         "Defect",
         back_populates="attachments",
-        lazy="select"
+        lazy="selectin"
     )
     
     uploader: Mapped["User"] = relationship(
         "User",
         back_populates="attachments",
-        lazy="select"
+        lazy="selectin"
+    )
+    
+    # Table constraints and indexes
+    __table_args__ = (
+        # Partial index on defect_id covering only non-deleted attachments
+        Index(
+            "ix_attachments_defect_id_active",
+            "defect_id",
+            postgresql_where=text("is_deleted = false")
+        ),
     )
     
     def __repr__(self) -> str:
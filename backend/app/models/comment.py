@@ -5,10 +5,10 @@ This module defines the Comment model with its relationships,
 constraints, and indexes as specified in the requirements.
 """
 
-from datetime import datetime, timezone
+from datetime import datetime
 from typing import TYPE_CHECKING
 
-from sqlalchemy import Integer, DateTime, ForeignKey, Text
+from sqlalchemy import BigInteger, Identity, Integer, DateTime, ForeignKey, Text, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import Base
@@ -29,8 +29,12 @@ class Comment(Base):
     """
     __tablename__ = "comments"
     
-    # Primary key
-    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    # Primary key (BIGINT identity; plain INTEGER on SQLite so it stays a rowid alias)
+    id: Mapped[int] = mapped_column(
+        BigInteger().with_variant(Integer, "sqlite"),
+        Identity(),
+        primary_key=True
+    )
     
     # Foreign keys
     defect_id: Mapped[int] = mapped_column(
@@ -53,7 +57,7 @@ class Comment(Base):
     # Timestamp
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
-        default=lambda: datetime.now(timezone.utc),
+        server_default=func.now(),
         nullable=False,
         index=True
     )
@@ -62,13 +66,13 @@ class Comment(Base):
     defect: Mapped["Defect"] = relationship(
         "Defect",
         back_populates="comments",
-        lazy="select"
+        lazy="selectin"
     )
     
     user: Mapped["User"] = relationship(
         "User",
         back_populates="comments",
-        lazy="select"
+        lazy="selectin"
     )
     
     def __repr__(self) -> str:
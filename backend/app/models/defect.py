@@ -6,16 +6,19 @@ constraints, indexes, and enum types as specified in the requirements.
 """
 
 import enum
-from datetime import datetime, timezone, date
+from datetime import datetime, date
 from typing import List
 
-from sqlalchemy import String, Integer, Date, DateTime, ForeignKey, Text, Enum, CheckConstraint, Index
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy import String, Integer, SmallInteger, Date, DateTime, ForeignKey, Text, CheckConstraint, Index, Select, func, select
+from sqlalchemy.types import TypeDecorator
+from sqlalchemy.orm import Mapped, mapped_column, relationship, selectinload, validates
 
 from app.models.base import Base
+from app.models.project import Project, ProjectStage
+from app.models.user import User
 
 
-class PriorityEnum(str, enum.Enum):
+class PriorityEnum(enum.StrEnum):
     """
     Priority levels for defects.
     
@@ -27,7 +30,7 @@ class PriorityEnum(str, enum.Enum):
     CRITICAL = "critical"
 
 
-class ActionTypeEnum(str, enum.Enum):
+class ActionTypeEnum(enum.StrEnum):
     """
     Action types for history log entries.
     
@@ -39,6 +42,47 @@ class ActionTypeEnum(str, enum.Enum):
     COMMENT_ADDED = "COMMENT_ADDED"
 
 
+class SmallIntEnum(TypeDecorator):
+    """
+    Stores a string enum as a SMALLINT code.
+    
+    Codes are assigned in member declaration order starting at 1, so ordering
+    by the column follows the enum order (e.g. LOW < MEDIUM < HIGH < CRITICAL).
+    The Python side keeps working with enum members.
+    
+    Members of a StrEnum hash and compare equal to their string values, so
+    the code table resolves both members and raw strings with a single dict
+    lookup; only unknown values go through the enum constructor (which
+    raises ValueError).
+    """
+    impl = SmallInteger
+    cache_ok = True
+    
+    def __init__(self, enum_class: type[enum.Enum]):
+        super().__init__()
+        self.enum_class = enum_class
+        self._members = tuple(enum_class)
+        self._codes = {member: code for code, member in enumerate(self._members, start=1)}
+    
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[self.enum_class(value)]
+        return code
+    
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        if not 1 <= value <= len(self._members):
+            raise ValueError(
+                f"{value!r} is not a valid {self.enum_class.__name__} code "
+                f"(expected 1-{len(self._members)})"
+            )
+        return self._members[value - 1]
+
+
 class DefectStatus(Base):
     """
     DefectStatus model representing possible states of a defect.
@@ -79,16 +123,20 @@ class Defect(Base):
     Requirements: 5.1-5.6, 6.3-6.4, 11.2, 11.4-11.6, 11.9
     """
     __tablename__ = "defects"
+    # Fetch the database-generated updated_at with UPDATE ... RETURNING on flush,
+    # so it is readable afterwards without a lazy refresh (async sessions can't)
+    __mapper_args__ = {"eager_defaults": True}
     
     # Primary key
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     
     # Project and stage relationships
+    # Not indexed on its own: ix_defects_project_status_priority_due has
+    # project_id as its leading column and serves project_id lookups
     project_id: Mapped[int] = mapped_column(
         Integer,
         ForeignKey("projects.id", ondelete="RESTRICT"),
-        nullable=False,
-        index=True
+        nullable=False
     )
     
     stage_id: Mapped[int | None] = mapped_column(
@@ -102,11 +150,10 @@ class Defect(Base):
     title: Mapped[str] = mapped_column(String(255), nullable=False)
     description: Mapped[str | None] = mapped_column(Text, nullable=True)
     
-    # Priority
+    # Priority (stored as SMALLINT 1-4, indexed through the composite index)
     priority: Mapped[PriorityEnum] = mapped_column(
-        Enum(PriorityEnum, name="priority_enum", native_enum=False),
-        nullable=False,
-        index=True
+        SmallIntEnum(PriorityEnum),
+        nullable=False
     )
     
     # Status relationship
@@ -125,11 +172,11 @@ class Defect(Base):
         index=True
     )
     
+    # Indexed through ix_defects_assigned_to_status_id
     assigned_to: Mapped[int | None] = mapped_column(
         Integer,
         ForeignKey("users.id", ondelete="SET NULL"),
-        nullable=True,
-        index=True
+        nullable=True
     )
     
     # Due date
@@ -138,47 +185,50 @@ class Defect(Base):
     # Timestamps
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
-        default=lambda: datetime.now(timezone.utc),
+        server_default=func.now(),
         nullable=False
     )
     updated_at: Mapped[datetime | None] = mapped_column(
         DateTime(timezone=True),
-        default=lambda: datetime.now(timezone.utc),
-        onupdate=lambda: datetime.now(timezone.utc),
+        server_default=func.now(),
+        onupdate=func.now(),
         nullable=True
     )
     
     # Relationships
+    # project/stage/status/creator/assignee are raise_on_sql: touching one that
+    # is not already in the session raises instead of issuing a lazy SELECT per
+    # row. Queries opt in with defect_list_loaders() or their own loader options.
     project: Mapped["Project"] = relationship(
         "Project",
         back_populates="defects",
-        lazy="select"
+        lazy="raise_on_sql"
     )
     
     stage: Mapped["ProjectStage"] = relationship(
         "ProjectStage",
         back_populates="defects",
-        lazy="select"
+        lazy="raise_on_sql"
     )
     
     status: Mapped["DefectStatus"] = relationship(
         "DefectStatus",
         back_populates="defects",
-        lazy="select"
+        lazy="raise_on_sql"
     )
     
     creator: Mapped["User"] = relationship(
         "User",
         back_populates="created_defects",
         foreign_keys=[created_by],
-        lazy="select"
+        lazy="raise_on_sql"
     )
     
     assignee: Mapped["User"] = relationship(
         "User",
         back_populates="assigned_defects",
         foreign_keys=[assigned_to],
-        lazy="select"
+        lazy="raise_on_sql"
     )
     
     comments: Mapped[List["Comment"]] = relationship(
@@ -204,11 +254,67 @@ class Defect(Base):
     
     # Table constraints and indexes
     __table_args__ = (
-        # CHECK constraint for title length (max 255 characters)
-        CheckConstraint("LENGTH(title) <= 255", name="title_length"),
-        # Composite index on (project_id, status_id)
-        Index("ix_defects_project_id_status_id", "project_id", "status_id"),
+        # CHECK constraint for priority codes (see SmallIntEnum)
+        CheckConstraint("priority BETWEEN 1 AND 4", name="priority_range"),
+        # Composite index matching the dashboard filter/sort order: equality
+        # columns (project_id, status_id) first, then priority and due_date.
+        # The INCLUDE columns let the list view run as an index-only scan.
+        Index(
+            "ix_defects_project_status_priority_due",
+            "project_id", "status_id", "priority", "due_date",
+            postgresql_include=["title", "assigned_to"]
+        ),
+        # Composite index on (assigned_to, status_id) for per-assignee dashboards
+        Index("ix_defects_assigned_to_status_id", "assigned_to", "status_id"),
     )
     
+    @validates("priority")
+    def validate_priority(self, key: str, value) -> PriorityEnum:
+        """Coerce priority to PriorityEnum, raising ValueError for unknown values."""
+        if isinstance(value, PriorityEnum):
+            return value
+        return PriorityEnum(value)
+    
     def __repr__(self) -> str:
         return f"<Defect(id={self.id}, title='{self.title}', priority={self.priority.value}, status_id={self.status_id})>"
+
+
+def defect_list_loaders() -> tuple:
+    """
+    Loader options for defect list queries.
+    
+    Batch-loads the raise_on_sql many-to-one relationships with one SELECT ... IN
+    per relationship, e.g. select(Defect).options(*defect_list_loaders()).
+    Only the columns a list row displays are loaded; other attributes of the
+    related objects are deferred.
+    """
+    return (
+        selectinload(Defect.project).load_only(Project.name),
+        selectinload(Defect.stage).load_only(ProjectStage.name),
+        selectinload(Defect.status).load_only(DefectStatus.name),
+        selectinload(Defect.creator).load_only(User.full_name, User.email),
+        selectinload(Defect.assignee).load_only(User.full_name),
+    )
+
+
+def defect_report_select(project_id: int) -> Select:
+    """
+    Column-only select of a project's defects for report exports.
+    
+    Rows come back as lightweight Row tuples instead of Defect instances, so
+    large exports skip identity-map and instance-state bookkeeping per row.
+    """
+    return (
+        select(
+            Defect.id,
+            Defect.title,
+            Defect.priority,
+            DefectStatus.name.label("status"),
+            Defect.assigned_to,
+            Defect.due_date,
+            Defect.created_at,
+        )
+        .join(DefectStatus, Defect.status_id == DefectStatus.id)
+        .where(Defect.project_id == project_id)
+        .order_by(Defect.id)
+    )
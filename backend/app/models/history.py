@@ -5,14 +5,14 @@ This module defines the HistoryLog model with its relationships,
 constraints, and indexes as specified in the requirements.
 """
 
-from datetime import datetime, timezone
+from datetime import datetime
 from typing import TYPE_CHECKING
 
-from sqlalchemy import Integer, DateTime, ForeignKey, Text, Enum, Index
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy import BigInteger, Identity, Integer, DateTime, ForeignKey, Text, CheckConstraint, Index, desc, func, text
+from sqlalchemy.orm import Mapped, mapped_column, relationship, validates
 
 from app.models.base import Base
-from app.models.defect import ActionTypeEnum
+from app.models.defect import ActionTypeEnum, SmallIntEnum
 
 if TYPE_CHECKING:
     from app.models.defect import Defect
@@ -27,19 +27,35 @@ class HistoryLog(Base):
     including the old and new values for the changed field.
     History logs are automatically deleted when the associated defect is deleted.
     
+    In the migrated schema the table is range-partitioned by month on
+    timestamp, with a BIGSERIAL id and (id, timestamp) as the primary key
+    (a partitioned table's primary key must include the partition column).
+    id alone stays unique and is used as the ORM identity.
+    
+    This mapping does not describe that layout: Base.metadata.create_all()
+    builds a plain, unpartitioned table with id as the only primary key and
+    without create_history_logs_partition(). That is enough for the test
+    suite and AUTO_CREATE_TABLES development databases, but create_all is
+    not supported for real deployments of this table; use the migrations.
+    
     Requirements: 9.1-9.5, 11.8, 11.11
     """
     __tablename__ = "history_logs"
     
-    # Primary key
-    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    # Primary key (BIGINT identity; plain INTEGER on SQLite so it stays a rowid alias)
+    id: Mapped[int] = mapped_column(
+        BigInteger().with_variant(Integer, "sqlite"),
+        Identity(),
+        primary_key=True
+    )
     
     # Foreign keys
+    # defect_id is not indexed on its own: covered by
+    # ix_history_logs_defect_timestamp_desc
     defect_id: Mapped[int] = mapped_column(
         Integer,
         ForeignKey("defects.id", ondelete="CASCADE"),
-        nullable=False,
-        index=True
+        nullable=False
     )
     
     user_id: Mapped[int] = mapped_column(
@@ -49,23 +65,34 @@ class HistoryLog(Base):
         index=True
     )
     
-    # Action information
+    # Action information (stored as SMALLINT 1-4)
     action_type: Mapped[ActionTypeEnum] = mapped_column(
-        Enum(ActionTypeEnum, name="action_type_enum", native_enum=False),
-        nullable=False,
-        index=True
+        SmallIntEnum(ActionTypeEnum),
+        nullable=False
     )
     
     # Old and new values (stored as text for flexibility)
+    # STATUS_CHANGE entries leave these NULL and use the status ids below
     old_value: Mapped[str | None] = mapped_column(Text, nullable=True)
     new_value: Mapped[str | None] = mapped_column(Text, nullable=True)
     
-    # Timestamp
+    # Old and new status for STATUS_CHANGE entries
+    old_status_id: Mapped[int | None] = mapped_column(
+        Integer,
+        ForeignKey("defect_statuses.id", ondelete="RESTRICT"),
+        nullable=True
+    )
+    new_status_id: Mapped[int | None] = mapped_column(
+        Integer,
+        ForeignKey("defect_statuses.id", ondelete="RESTRICT"),
+        nullable=True
+    )
+    
+    # Timestamp (indexed by the BRIN index ix_history_logs_timestamp_brin)
     timestamp: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
-        default=lambda: datetime.now(timezone.utc),
-        nullable=False,
-        index=True
+        server_default=func.now(),
+        nullable=False
     )
     
     # Relationships
@@ -83,9 +110,44 @@ class HistoryLog(Base):
     
     # Table constraints and indexes
     __table_args__ = (
-        # Composite index on (defect_id, timestamp)
-        Index("ix_history_logs_defect_id_timestamp", "defect_id", "timestamp"),
+        # CHECK constraint for action type codes (see SmallIntEnum)
+        CheckConstraint("action_type BETWEEN 1 AND 4", name="action_type_range"),
+        # Composite index on (defect_id, timestamp DESC) for "newest first"
+        # timelines; INCLUDE columns make fetching the last N entries of a
+        # defect an index-only scan
+        Index(
+            "ix_history_logs_defect_timestamp_desc",
+            "defect_id", desc("timestamp"),
+            postgresql_include=["action_type", "user_id"]
+        ),
+        # Rows are appended in timestamp order, so a BRIN index serves time
+        # range scans at a fraction of a btree's size
+        Index(
+            "ix_history_logs_timestamp_brin",
+            "timestamp",
+            postgresql_using="brin",
+            postgresql_with={"pages_per_range": 32}
+        ),
+        # Only STATUS_CHANGE entries set the status ids; partial indexes
+        # back the RESTRICT foreign keys without indexing the NULLs
+        Index(
+            "ix_history_logs_old_status_id",
+            "old_status_id",
+            postgresql_where=text("old_status_id IS NOT NULL")
+        ),
+        Index(
+            "ix_history_logs_new_status_id",
+            "new_status_id",
+            postgresql_where=text("new_status_id IS NOT NULL")
+        ),
     )
     
+    @validates("action_type")
+    def validate_action_type(self, key: str, value) -> ActionTypeEnum:
+        """Coerce action_type to ActionTypeEnum, raising ValueError for unknown values."""
+        if isinstance(value, ActionTypeEnum):
+            return value
+        return ActionTypeEnum(value)
+    
     def __repr__(self) -> str:
         return f"<HistoryLog(id={self.id}, defect_id={self.defect_id}, action_type={self.action_type.value})>"
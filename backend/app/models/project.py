@@ -5,10 +5,10 @@ This module defines the Project and ProjectStage models with their relationships
 constraints, and indexes as specified in the requirements.
 """
 
-from datetime import datetime, timezone, date
+from datetime import datetime, date
 from typing import List
 
-from sqlalchemy import String, Integer, Date, DateTime, ForeignKey, Text, Index
+from sqlalchemy import String, Integer, Date, DateTime, ForeignKey, Text, Index, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import Base
@@ -24,6 +24,8 @@ class Project(Base):
     Requirements: 3.1-3.5, 11.3, 11.4
     """
     __tablename__ = "projects"
+    # Fetch updated_at on flush (UPDATE ... RETURNING); see Defect
+    __mapper_args__ = {"eager_defaults": True}
     
     # Primary key
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
@@ -47,13 +49,13 @@ class Project(Base):
     # Timestamps
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
-        default=lambda: datetime.now(timezone.utc),
+        server_default=func.now(),
         nullable=False
     )
     updated_at: Mapped[datetime | None] = mapped_column(
         DateTime(timezone=True),
-        default=lambda: datetime.now(timezone.utc),
-        onupdate=lambda: datetime.now(timezone.utc),
+        server_default=func.now(),
+        onupdate=func.now(),
         nullable=True
     )
     
@@ -74,7 +76,7 @@ class Project(Base):
     defects: Mapped[List["Defect"]] = relationship(
         "Defect",
         back_populates="project",
-        lazy="select"
+        lazy="raise_on_sql"
     )
     
     reports: Mapped[List["Report"]] = relationship(
@@ -102,11 +104,11 @@ class ProjectStage(Base):
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     
     # Project relationship
+    # Not indexed on its own: covered by ix_project_stages_project_id_name
     project_id: Mapped[int] = mapped_column(
         Integer,
         ForeignKey("projects.id", ondelete="CASCADE"),
-        nullable=False,
-        index=True
+        nullable=False
     )
     
     # Stage information
@@ -5,10 +5,11 @@ This module defines the Role and User models with their relationships,
 constraints, and indexes as specified in the requirements.
 """
 
-from datetime import datetime, timezone
+from datetime import datetime
 from typing import List
 
-from sqlalchemy import String, Integer, Boolean, DateTime, ForeignKey, Text
+from sqlalchemy import String, Integer, Boolean, DateTime, ForeignKey, Text, Index, text, func
+from sqlalchemy.dialects.postgresql import CITEXT
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import Base
@@ -53,13 +54,22 @@ class User(Base):
     Requirements: 1.1-1.5, 11.1, 11.2
     """
     __tablename__ = "users"
+    # Fetch updated_at on flush (UPDATE ... RETURNING); see Defect
+    __mapper_args__ = {"eager_defaults": True}
     
     # Primary key
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     
     # User information
     full_name: Mapped[str] = mapped_column(String(255), nullable=False)
-    email: Mapped[str] = mapped_column(String(255), unique=True, nullable=False, index=True)
+    # CITEXT makes equality case-insensitive, so the unique btree serves
+    # login lookups without a lower(email) expression index
+    email: Mapped[str] = mapped_column(
+        String(255).with_variant(CITEXT(), "postgresql"),
+        unique=True,
+        nullable=False,
+        index=True
+    )
     password_hash: Mapped[str] = mapped_column(String(255), nullable=False)
     
     # Role relationship
@@ -71,18 +81,19 @@ class User(Base):
     )
     
     # Status
-    is_active: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False, index=True)
+    # Not indexed on its own; see the partial indexes in __table_args__
+    is_active: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False)
     
     # Timestamps
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
-        default=lambda: datetime.now(timezone.utc),
+        server_default=func.now(),
         nullable=False
     )
     updated_at: Mapped[datetime | None] = mapped_column(
         DateTime(timezone=True),
-        default=lambda: datetime.now(timezone.utc),
-        onupdate=lambda: datetime.now(timezone.utc),
+        server_default=func.now(),
+        onupdate=func.now(),
         nullable=True
     )
     
@@ -99,14 +110,14 @@ class User(Base):
         "Defect",
         back_populates="creator",
         foreign_keys="[Defect.created_by]",
-        lazy="select"
+        lazy="raise_on_sql"
     )
     
     assigned_defects: Mapped[List["Defect"]] = relationship(
         "Defect",
         back_populates="assignee",
         foreign_keys="[Defect.assigned_to]",
-        lazy="select"
+        lazy="raise_on_sql"
     )
     
     comments: Mapped[List["Comment"]] = relationship(
@@ -139,5 +150,13 @@ class User(Base):
         lazy="select"
     )
     
+    # Table constraints and indexes
+    __table_args__ = (
+        # Partial indexes covering only active users, which is what login
+        # and user listings filter on
+        Index("ix_users_active_email", "email", postgresql_where=text("is_active")),
+        Index("ix_users_active_role", "role_id", postgresql_where=text("is_active")),
+    )
+    
     def __repr__(self) -> str:
         return f"<User(id={self.id}, email='{self.email}', role_id={self.role_id})>"
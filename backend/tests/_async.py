@@ -0,0 +1,38 @@
+"""
+Async session adapter for tests.
+
+The app's async helpers (count loaders, reference cache) only await
+session.execute() and read session.info. The test suite runs on a sync
+Session (no async driver is required), so this adapter exposes that subset
+of the AsyncSession interface on top of db_session. Statements still run
+against the real test database.
+"""
+
+import asyncio
+
+from sqlalchemy.orm import Session
+
+
+class AsyncSessionAdapter:
+    """
+    Awaitable execute() over a sync Session.
+    
+    Each execute() yields to the event loop before running, like a real
+    driver round trip would, and max_in_flight records how many calls were
+    ever active at once (an AsyncSession only allows one).
+    """
+    
+    def __init__(self, session: Session):
+        self._session = session
+        self.info = {}
+        self.in_flight = 0
+        self.max_in_flight = 0
+    
+    async def execute(self, statement, *args, **kwargs):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0)
+            return self._session.execute(statement, *args, **kwargs)
+        finally:
+            self.in_flight -= 1
@@ -0,0 +1,38 @@
+"""
+Bulk insert helper for tests.
+
+Splits large row lists into batches so a single INSERT never exceeds the
+dialect's bound-parameter limit (e.g. SQLite's SQLITE_MAX_VARIABLE_NUMBER).
+"""
+
+import itertools
+from typing import Iterable, Optional
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+# Rows per INSERT by dialect; SQLite and SQL Server cap bound parameters low
+_BATCH_SIZES = {
+    "sqlite": 500,
+    "mssql": 100,
+}
+_DEFAULT_BATCH_SIZE = 1000
+
+
+def bulk_insert(session: Session, target, rows: Iterable[dict], batch_size: Optional[int] = None) -> None:
+    """
+    Insert rows into a mapped class or Table in executemany batches.
+    
+    Args:
+        session: Session to execute in (nothing is committed)
+        target: Mapped class (ORM bulk insert) or Table (Core insert)
+        rows: Column-value dicts
+        batch_size: Rows per statement; picked from the dialect when omitted
+    """
+    if batch_size is None:
+        batch_size = _BATCH_SIZES.get(session.get_bind().dialect.name, _DEFAULT_BATCH_SIZE)
+    
+    statement = insert(target)
+    rows = iter(rows)
+    while chunk := list(itertools.islice(rows, batch_size)):
+        session.execute(statement, chunk)
@@ -6,15 +6,21 @@ for all test modules.
 """
 
 import os
+from contextlib import contextmanager
+from datetime import date
+
 import pytest
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy import create_engine, event, insert, make_url, text
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
 
+from app import cache
 from app.database import Base
 from app.models import (
     Role, User, Project, ProjectStage, DefectStatus, Defect,
     Comment, Attachment, HistoryLog, Report, PriorityEnum, ActionTypeEnum
 )
+from tests._bulk import bulk_insert
 
 # Disable .pgpass and other config files reading to avoid Unicode issues on Windows
 os.environ['PGPASSFILE'] = 'nul'
@@ -30,97 +36,315 @@ TEST_DATABASE_URL = os.getenv(
 )
 
 # Alternative: use in-memory SQLite for testing if PostgreSQL is not available
-# TEST_DATABASE_URL = "sqlite:///:memory:"
+# (TEST_DATABASE_URL=sqlite://); PostgreSQL-only features such as CITEXT and
+# partial indexes fall back to their generic forms there
 
+# Under pytest-xdist each worker gets its own database, e.g. test_frame1_db_gw0
+XDIST_WORKER = os.getenv("PYTEST_XDIST_WORKER")
 
-@pytest.fixture(scope="function")
+
+def _worker_database_url(url: str):
+    """Return url pointing at the current xdist worker's own database."""
+    url = make_url(url)
+    if not XDIST_WORKER or not url.database or url.database == ":memory:":
+        return url
+    if url.get_backend_name() == "sqlite":
+        root, ext = os.path.splitext(url.database)
+        return url.set(database=f"{root}_{XDIST_WORKER}{ext}")
+    return url.set(database=f"{url.database}_{XDIST_WORKER}")
+
+
+def _ensure_postgres_database(url) -> None:
+    """Create the worker's PostgreSQL database if it does not exist yet."""
+    admin_engine = create_engine(url.set(database="postgres"), isolation_level="AUTOCOMMIT")
+    try:
+        with admin_engine.connect() as conn:
+            exists = conn.scalar(
+                text("SELECT 1 FROM pg_database WHERE datname = :name"),
+                {"name": url.database}
+            )
+            if not exists:
+                conn.execute(text(f'CREATE DATABASE "{url.database}"'))
+    finally:
+        admin_engine.dispose()
+
+
+TEST_DATABASE_URL = _worker_database_url(TEST_DATABASE_URL)
+
+
+@pytest.fixture(scope="session")
 def engine():
-    """Create a test database engine."""
-    test_engine = create_engine(TEST_DATABASE_URL, echo=False)
+    """Create the test database engine and schema once per test session."""
+    engine_args = {}
+    connect_args = {}
+    if TEST_DATABASE_URL.get_backend_name() == "sqlite":
+        # One shared connection, so an in-memory database lives for the whole run
+        engine_args["poolclass"] = StaticPool
+        connect_args["check_same_thread"] = False
+    elif TEST_DATABASE_URL.get_backend_name() == "postgresql":
+        # Test data is disposable: don't wait for WAL flushes on commit
+        connect_args["options"] = "-c synchronous_commit=off"
+        if XDIST_WORKER:
+            _ensure_postgres_database(TEST_DATABASE_URL)
+    
+    # One engine for the whole run keeps the compiled-statement cache warm
+    test_engine = create_engine(
+        TEST_DATABASE_URL,
+        echo=False,
+        query_cache_size=1200,
+        connect_args=connect_args,
+        **engine_args
+    )
+    
+    if test_engine.dialect.name == "sqlite":
+        # pysqlite manages BEGIN itself and breaks SAVEPOINTs; hand it to SQLAlchemy.
+        # Skip fsyncs, keep the journal in memory and enforce foreign keys
+        # (off by default in SQLite; the FK and cascade tests rely on them).
+        @event.listens_for(test_engine, "connect")
+        def _configure_sqlite(dbapi_connection, connection_record):
+            dbapi_connection.isolation_level = None
+            dbapi_connection.executescript(
+                "PRAGMA synchronous=OFF;"
+                "PRAGMA journal_mode=MEMORY;"
+                "PRAGMA temp_store=MEMORY;"
+                "PRAGMA foreign_keys=ON;"
+            )
+        
+        @event.listens_for(test_engine, "begin")
+        def _emit_begin(conn):
+            conn.exec_driver_sql("BEGIN")
+    
+    if test_engine.dialect.name == "postgresql":
+        # users.email is CITEXT
+        with test_engine.begin() as conn:
+            conn.execute(text("CREATE EXTENSION IF NOT EXISTS citext"))
     
     # Create all tables
+    Base.metadata.drop_all(bind=test_engine)
     Base.metadata.create_all(bind=test_engine)
     
     yield test_engine
     
-    # Drop all tables after test
+    # Drop all tables after the session
     Base.metadata.drop_all(bind=test_engine)
     test_engine.dispose()
 
 
+@pytest.fixture(scope="class")
+def class_connection(engine):
+    """
+    Connection whose outer transaction spans a whole test class.
+    
+    Class-scoped fixtures write their rows through it; db_session runs the
+    class's tests on the same connection inside a SAVEPOINT, and the outer
+    ROLLBACK at class teardown discards the rows. Nothing is ever committed,
+    so other tests never see them.
+    """
+    connection = engine.connect()
+    transaction = connection.begin()
+    
+    yield connection
+    
+    transaction.rollback()
+    connection.close()
+
+
 @pytest.fixture(scope="function")
-def db_session(engine):
-    """Create a test database session."""
-    TestSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-    session = TestSessionLocal()
+def db_session(request, engine, seed):
+    """
+    Create a test database session inside an outer transaction.
+    
+    The session joins the connection's transaction through SAVEPOINTs, so
+    commit() and rollback() in tests only touch the savepoint and the outer
+    ROLLBACK at teardown discards everything the test wrote. Every test sees
+    the shared seed rows (see seed). Tests of a class using class_connection
+    run on that connection, nested in a SAVEPOINT, and also see the class's
+    rows.
+    """
+    if "class_connection" in request.fixturenames:
+        connection = request.getfixturevalue("class_connection")
+        transaction = connection.begin_nested()
+        owns_connection = False
+    else:
+        connection = engine.connect()
+        transaction = connection.begin()
+        owns_connection = True
+    # expire_on_commit=False: fixture objects stay loaded after commit, so
+    # neither fixtures nor tests pay a refresh SELECT to read them again
+    session = Session(
+        bind=connection,
+        autoflush=False,
+        expire_on_commit=False,
+        join_transaction_mode="create_savepoint"
+    )
     
     yield session
     
     session.close()
+    transaction.rollback()
+    if owns_connection:
+        connection.close()
 
 
 @pytest.fixture(scope="function")
-def sample_role(db_session: Session):
-    """Create a sample role for testing."""
-    role = Role(name="Engineer", description="Engineering role")
-    db_session.add(role)
-    db_session.commit()
-    db_session.refresh(role)
-    return role
+def reference_cache():
+    """Start and finish the test with an empty reference-data cache."""
+    cache.invalidate()
+    yield
+    cache.invalidate()
+
+
+_TRANSACTION_CONTROL = ("BEGIN", "SAVEPOINT", "RELEASE", "ROLLBACK")
 
 
 @pytest.fixture(scope="function")
-def sample_user(db_session: Session, sample_role: Role):
-    """Create a sample user for testing."""
-    user = User(
-        full_name="John Doe",
-        email="john.doe@example.com",
-        password_hash="hashed_password_123",
-        role_id=sample_role.id,
-        is_active=True
-    )
-    db_session.add(user)
-    db_session.commit()
-    db_session.refresh(user)
-    return user
+def capture_queries(engine):
+    """
+    Return a context manager that records the SQL statements sent to the database.
+    
+    Transaction control (BEGIN, SAVEPOINT, RELEASE, ROLLBACK TO) is not
+    recorded, since the db_session fixture issues it on its own.
+    
+    Usage:
+        with capture_queries() as statements:
+            ...
+        assert len(statements) == 2
+    """
+    @contextmanager
+    def capture():
+        statements = []
+        
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            if not statement.startswith(_TRANSACTION_CONTROL):
+                statements.append(statement)
+        
+        event.listen(engine, "before_cursor_execute", before_cursor_execute)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    
+    return capture
+
 
+def _insert_one(session: Session, model, values: dict):
+    """Insert one row with INSERT ... RETURNING and return the loaded object."""
+    return session.scalars(insert(model).returning(model), [values]).one()
+
+
+@pytest.fixture(scope="session")
+def seed(engine):
+    """
+    Insert the shared sample role, user, project and defect status once per session.
+    
+    Tests run inside a rolled-back SAVEPOINT (see db_session), so changes they
+    make to these rows never outlive the test. Returns the rows as detached,
+    fully loaded objects.
+    """
+    with Session(engine, expire_on_commit=False) as session:
+        role = _insert_one(session, Role, {
+            "name": "Engineer",
+            "description": "Engineering role",
+        })
+        user = _insert_one(session, User, {
+            "full_name": "John Doe",
+            "email": "john.doe@example.com",
+            "password_hash": "hashed_password_123",
+            "role_id": role.id,
+            "is_active": True,
+        })
+        project = _insert_one(session, Project, {
+            "name": "Test Construction Project",
+            "description": "A test project",
+            "manager_id": user.id,
+        })
+        status = _insert_one(session, DefectStatus, {
+            "name": "New",
+            "description": "Newly created defect",
+        })
+        session.commit()
+        return {
+            "role": role,
+            "user": user,
+            "project": project,
+            "defect_status": status,
+        }
+
+
+# The sample_* fixtures merge the seed rows into the test's session with
+# load=False: the objects become persistent there without a SELECT or INSERT
 
 @pytest.fixture(scope="function")
-def sample_project(db_session: Session, sample_user: User):
-    """Create a sample project for testing."""
-    project = Project(
-        name="Test Construction Project",
-        description="A test project",
-        manager_id=sample_user.id
-    )
-    db_session.add(project)
-    db_session.commit()
-    db_session.refresh(project)
-    return project
+def sample_role(db_session: Session, seed):
+    """Sample role for testing."""
+    return db_session.merge(seed["role"], load=False)
 
 
 @pytest.fixture(scope="function")
-def sample_defect_status(db_session: Session):
-    """Create a sample defect status for testing."""
-    status = DefectStatus(name="New", description="Newly created defect")
-    db_session.add(status)
-    db_session.commit()
-    db_session.refresh(status)
-    return status
+def sample_user(db_session: Session, seed):
+    """Sample user for testing."""
+    return db_session.merge(seed["user"], load=False)
 
 
 @pytest.fixture(scope="function")
-def sample_defect(db_session: Session, sample_project: Project, sample_defect_status: DefectStatus, sample_user: User):
+def sample_project(db_session: Session, seed):
+    """Sample project for testing."""
+    return db_session.merge(seed["project"], load=False)
+
+
+@pytest.fixture(scope="function")
+def sample_defect_status(db_session: Session, seed):
+    """Sample defect status for testing."""
+    return db_session.merge(seed["defect_status"], load=False)
+
+
+@pytest.fixture(scope="function")
+def sample_defect(db_session: Session, seed):
     """Create a sample defect for testing."""
-    defect = Defect(
-        project_id=sample_project.id,
-        title="Test Defect",
-        description="A test defect",
-        priority=PriorityEnum.HIGH,
-        status_id=sample_defect_status.id,
-        created_by=sample_user.id
-    )
-    db_session.add(defect)
+    defect = _insert_one(db_session, Defect, {
+        "project_id": seed["project"].id,
+        "title": "Test Defect",
+        "description": "A test defect",
+        "priority": PriorityEnum.HIGH,
+        "status_id": seed["defect_status"].id,
+        "created_by": seed["user"].id,
+    })
     db_session.commit()
-    db_session.refresh(defect)
     return defect
+
+
+# (title, priority, due_date) of the defects inserted by seeded_defects
+SEEDED_DEFECTS = [
+    ("Seeded Defect 1", PriorityEnum.LOW, date(2024, 6, 1)),
+    ("Seeded Defect 2", PriorityEnum.CRITICAL, date(2024, 5, 1)),
+    ("Seeded Defect 3", PriorityEnum.HIGH, date(2024, 4, 1)),
+    ("Seeded Defect 4", PriorityEnum.MEDIUM, date(2024, 7, 1)),
+    ("Seeded Defect 5", PriorityEnum.HIGH, date(2024, 3, 1)),
+    ("Seeded Defect 6", PriorityEnum.LOW, date(2024, 8, 1)),
+]
+
+
+@pytest.fixture(scope="class")
+def seeded_defects(class_connection, seed):
+    """
+    Insert SEEDED_DEFECTS into the sample project once for a test class.
+    
+    The rows live in the class's outer transaction (see class_connection):
+    every test in the class reads them without inserting its own, and they
+    are rolled back when the class finishes.
+    """
+    with Session(bind=class_connection, join_transaction_mode="create_savepoint") as session:
+        bulk_insert(session, Defect, [
+            dict(
+                project_id=seed["project"].id,
+                title=title,
+                priority=priority,
+                status_id=seed["defect_status"].id,
+                created_by=seed["user"].id,
+                due_date=due_date
+            )
+            for title, priority, due_date in SEEDED_DEFECTS
+        ])
+        session.commit()
+    
+    return SEEDED_DEFECTS
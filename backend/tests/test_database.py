@@ -7,70 +7,68 @@ transaction rollbacks, and error handling.
 Requirements: All requirements
 """
 
+import asyncio
+
 import pytest
 from datetime import date, datetime
-from sqlalchemy import select, and_, or_, func, desc
-from sqlalchemy.exc import IntegrityError, DataError
-from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy import select, insert, and_, or_, func, desc, bindparam, union_all
+from sqlalchemy.exc import IntegrityError, DataError, InvalidRequestError
+from sqlalchemy.orm import Session, joinedload, raiseload, selectinload
 
+from app import cache
+from tests._async import AsyncSessionAdapter
+from tests._bulk import bulk_insert
+from tests.conftest import SEEDED_DEFECTS
 from app.models import (
     Role, User, Project, ProjectStage, DefectStatus, Defect,
-    Comment, Attachment, HistoryLog, Report, PriorityEnum, ActionTypeEnum
+    Comment, Attachment, HistoryLog, Report, PriorityEnum, ActionTypeEnum,
+    defect_list_loaders, defect_report_select
+)
+
+# Shared statements are built once; the engine's compiled cache reuses them
+DEFECTS_BY_PROJECT_AND_STATUS = select(Defect).where(
+    and_(
+        Defect.project_id == bindparam("project_id"),
+        Defect.status_id == bindparam("status_id")
+    )
 )
 
 
 class TestRoleCRUD:
     """Integration tests for Role CRUD operations."""
     
-    def test_create_role(self, db_session: Session):
-        """Test creating a role in the database."""
+    def test_role_crud(self, db_session: Session):
+        """Test creating, reading, updating and deleting a role."""
+        # Create
         role = Role(name="Admin", description="Administrator role")
         db_session.add(role)
-        db_session.commit()
+        db_session.flush()
+        role_id = role.id
         
-        # Query back from database
+        # Read
         queried_role = db_session.query(Role).filter_by(name="Admin").first()
         assert queried_role is not None
-        assert queried_role.name == "Admin"
+        assert queried_role.id == role_id
         assert queried_role.description == "Administrator role"
-    
-    def test_read_role(self, db_session: Session, sample_role: Role):
-        """Test reading a role from the database."""
-        role = db_session.query(Role).filter_by(id=sample_role.id).first()
-        assert role is not None
-        assert role.id == sample_role.id
-        assert role.name == sample_role.name
-    
-    def test_update_role(self, db_session: Session, sample_role: Role):
-        """Test updating a role in the database."""
-        sample_role.description = "Updated description"
-        db_session.commit()
         
-        # Query back to verify update
-        updated_role = db_session.query(Role).filter_by(id=sample_role.id).first()
-        assert updated_role.description == "Updated description"
-    
-    def test_delete_role(self, db_session: Session):
-        """Test deleting a role from the database."""
-        role = Role(name="Temporary", description="Temporary role")
-        db_session.add(role)
-        db_session.commit()
-        role_id = role.id
-        
-        # Delete the role
-        db_session.delete(role)
-        db_session.commit()
+        # Update
+        queried_role.description = "Updated description"
+        db_session.flush()
+        assert queried_role.description == "Updated description"
         
-        # Verify deletion
-        deleted_role = db_session.query(Role).filter_by(id=role_id).first()
-        assert deleted_role is None
+        # Delete
+        db_session.delete(queried_role)
+        db_session.flush()
+        db_session.expire_all()
+        assert db_session.get(Role, role_id) is None
 
 
 class TestUserCRUD:
     """Integration tests for User CRUD operations."""
     
-    def test_create_user(self, db_session: Session, sample_role: Role):
-        """Test creating a user in the database."""
+    def test_user_crud(self, db_session: Session, sample_role: Role, capture_queries):
+        """Test creating, reading (with role), updating and deleting a user."""
+        # Create
         user = User(
             full_name="Alice Smith",
             email="alice@example.com",
@@ -78,54 +76,43 @@ class TestUserCRUD:
             role_id=sample_role.id
         )
         db_session.add(user)
-        db_session.commit()
-        
-        queried_user = db_session.query(User).filter_by(email="alice@example.com").first()
-        assert queried_user is not None
-        assert queried_user.full_name == "Alice Smith"
-        assert queried_user.is_active is True
-    
-    def test_read_user_with_role(self, db_session: Session, sample_user: User):
-        """Test reading a user with role relationship."""
-        user = db_session.query(User).options(joinedload(User.role)).filter_by(id=sample_user.id).first()
-        assert user is not None
-        assert user.role is not None
-        assert user.role.name == "Engineer"
-    
-    def test_update_user(self, db_session: Session, sample_user: User):
-        """Test updating a user in the database."""
-        sample_user.full_name = "John Updated"
-        sample_user.is_active = False
-        db_session.commit()
-        
-        updated_user = db_session.query(User).filter_by(id=sample_user.id).first()
-        assert updated_user.full_name == "John Updated"
-        assert updated_user.is_active is False
-    
-    def test_delete_user_with_no_dependencies(self, db_session: Session, sample_role: Role):
-        """Test deleting a user with no dependencies."""
-        user = User(
-            full_name="Temp User",
-            email="temp@example.com",
-            password_hash="hash",
-            role_id=sample_role.id
-        )
-        db_session.add(user)
-        db_session.commit()
+        db_session.flush()
         user_id = user.id
         
-        db_session.delete(user)
-        db_session.commit()
-        
-        deleted_user = db_session.query(User).filter_by(id=user_id).first()
-        assert deleted_user is None
+        # Read with role relationship
+        with capture_queries() as statements:
+            queried_user = (
+                db_session.query(User)
+                .options(joinedload(User.role))
+                .filter_by(email="alice@example.com")
+                .first()
+            )
+            assert queried_user is not None
+            assert queried_user.full_name == "Alice Smith"
+            assert queried_user.is_active is True
+            assert queried_user.role.name == "Engineer"
+        assert len(statements) == 1
+        
+        # Update
+        queried_user.full_name = "Alice Updated"
+        queried_user.is_active = False
+        db_session.flush()
+        assert queried_user.full_name == "Alice Updated"
+        assert queried_user.is_active is False
+        
+        # Delete (no dependent rows)
+        db_session.delete(queried_user)
+        db_session.flush()
+        db_session.expire_all()
+        assert db_session.get(User, user_id) is None
 
 
 class TestProjectCRUD:
     """Integration tests for Project CRUD operations."""
     
-    def test_create_project(self, db_session: Session, sample_user: User):
-        """Test creating a project in the database."""
+    def test_project_crud(self, db_session: Session, sample_user: User, capture_queries):
+        """Test creating, reading (with manager), updating and deleting a project."""
+        # Create
         project = Project(
             name="New Building",
             description="Construction project",
@@ -134,28 +121,34 @@ class TestProjectCRUD:
             end_date=date(2024, 12, 31)
         )
         db_session.add(project)
-        db_session.commit()
-        
-        queried_project = db_session.query(Project).filter_by(name="New Building").first()
-        assert queried_project is not None
-        assert queried_project.manager_id == sample_user.id
-    
-    def test_read_project_with_manager(self, db_session: Session, sample_project: Project):
-        """Test reading a project with manager relationship."""
-        project = db_session.query(Project).options(joinedload(Project.manager)).filter_by(id=sample_project.id).first()
-        assert project is not None
-        assert project.manager is not None
-        assert project.manager.email == "john.doe@example.com"
-    
-    def test_update_project(self, db_session: Session, sample_project: Project):
-        """Test updating a project in the database."""
-        sample_project.name = "Updated Project Name"
-        sample_project.end_date = date(2025, 6, 30)
-        db_session.commit()
-        
-        updated_project = db_session.query(Project).filter_by(id=sample_project.id).first()
-        assert updated_project.name == "Updated Project Name"
-        assert updated_project.end_date == date(2025, 6, 30)
+        db_session.flush()
+        project_id = project.id
+        
+        # Read with manager relationship
+        with capture_queries() as statements:
+            queried_project = (
+                db_session.query(Project)
+                .options(joinedload(Project.manager))
+                .filter_by(name="New Building")
+                .first()
+            )
+            assert queried_project is not None
+            assert queried_project.manager_id == sample_user.id
+            assert queried_project.manager.email == "john.doe@example.com"
+        assert len(statements) == 1
+        
+        # Update
+        queried_project.name = "Updated Project Name"
+        queried_project.end_date = date(2025, 6, 30)
+        db_session.flush()
+        assert queried_project.name == "Updated Project Name"
+        assert queried_project.end_date == date(2025, 6, 30)
+        
+        # Delete
+        db_session.delete(queried_project)
+        db_session.flush()
+        db_session.expire_all()
+        assert db_session.get(Project, project_id) is None
     
     def test_delete_project_cascades_to_stages(self, db_session: Session, sample_project: Project):
         """Test that deleting a project cascades to project stages."""
@@ -165,13 +158,14 @@ class TestProjectCRUD:
             description="Foundation work"
         )
         db_session.add(stage)
-        db_session.commit()
+        db_session.flush()
         stage_id = stage.id
         
         db_session.delete(sample_project)
-        db_session.commit()
+        db_session.flush()
         
-        deleted_stage = db_session.query(ProjectStage).filter_by(id=stage_id).first()
+        db_session.expire_all()
+        deleted_stage = db_session.get(ProjectStage, stage_id)
         assert deleted_stage is None
 
 
@@ -191,38 +185,72 @@ class TestDefectCRUD:
             due_date=date(2024, 6, 30)
         )
         db_session.add(defect)
-        db_session.commit()
+        db_session.flush()
         
         queried_defect = db_session.query(Defect).filter_by(title="Wall crack").first()
         assert queried_defect is not None
         assert queried_defect.priority == PriorityEnum.CRITICAL
     
-    def test_read_defect_with_relationships(self, db_session: Session, sample_defect: Defect):
+    def test_read_defect_with_relationships(self, db_session: Session, sample_defect: Defect,
+                                            capture_queries):
         """Test reading a defect with all relationships."""
-        defect = (
-            db_session.query(Defect)
-            .options(
-                joinedload(Defect.project),
-                joinedload(Defect.status),
-                joinedload(Defect.creator)
+        db_session.expunge_all()
+        with capture_queries() as statements:
+            defect = (
+                db_session.query(Defect)
+                .options(
+                    selectinload(Defect.project),
+                    selectinload(Defect.status),
+                    selectinload(Defect.creator),
+                    raiseload("*")
+                )
+                .filter_by(id=sample_defect.id)
+                .first()
             )
-            .filter_by(id=sample_defect.id)
-            .first()
-        )
+        # One SELECT for the defect plus one per selectinload
+        assert len(statements) == 4
         assert defect is not None
         assert defect.project is not None
         assert defect.status is not None
         assert defect.creator is not None
     
+    def test_defect_list_loaders_batch_relationships(self, db_session: Session, sample_defect: Defect,
+                                                     capture_queries):
+        """Test that unloaded defect relationships raise unless opted in."""
+        defect_id = sample_defect.id
+        project_id, status_id = sample_defect.project_id, sample_defect.status_id
+        created_by = sample_defect.created_by
+        db_session.expunge_all()
+        defect = db_session.get(Defect, defect_id)
+        with pytest.raises(InvalidRequestError):
+            defect.project
+        
+        db_session.expunge_all()
+        with capture_queries() as statements:
+            defect = (
+                db_session.query(Defect)
+                .options(*defect_list_loaders())
+                .filter_by(id=defect_id)
+                .one()
+            )
+            assert defect.project.id == project_id
+            assert defect.status.id == status_id
+            assert defect.status.name == "New"
+            assert defect.creator.id == created_by
+            assert defect.creator.email == "john.doe@example.com"
+            assert defect.assignee is None
+            assert defect.stage is None
+        # The defect, then one batched SELECT per loaded relationship
+        assert len(statements) == 4
+    
     def test_update_defect(self, db_session: Session, sample_defect: Defect):
         """Test updating a defect in the database."""
         sample_defect.title = "Updated Defect Title"
         sample_defect.priority = PriorityEnum.LOW
-        db_session.commit()
+        db_session.flush()
         
-        updated_defect = db_session.query(Defect).filter_by(id=sample_defect.id).first()
-        assert updated_defect.title == "Updated Defect Title"
-        assert updated_defect.priority == PriorityEnum.LOW
+        assert sample_defect.title == "Updated Defect Title"
+        assert sample_defect.priority == PriorityEnum.LOW
     
     def test_delete_defect_cascades_to_children(self, db_session: Session, sample_defect: Defect, sample_user: User):
         """Test that deleting a defect cascades to comments, attachments, and history logs."""
@@ -241,7 +269,7 @@ class TestDefectCRUD:
             new_value="Created"
         )
         db_session.add_all([comment, attachment, history])
-        db_session.commit()
+        db_session.flush()
         
         comment_id = comment.id
         attachment_id = attachment.id
@@ -249,79 +277,24 @@ class TestDefectCRUD:
         
         # Delete defect
         db_session.delete(sample_defect)
-        db_session.commit()
-        
-        # Verify cascade deletion
-        assert db_session.query(Comment).filter_by(id=comment_id).first() is None
-        assert db_session.query(Attachment).filter_by(id=attachment_id).first() is None
-        assert db_session.query(HistoryLog).filter_by(id=history_id).first() is None
+        db_session.flush()
+        
+        # Verify cascade deletion: one round trip for all three child tables
+        remaining = db_session.scalar(
+            select(func.count()).select_from(
+                union_all(
+                    select(Comment.id).where(Comment.id == comment_id),
+                    select(Attachment.id).where(Attachment.id == attachment_id),
+                    select(HistoryLog.id).where(HistoryLog.id == history_id)
+                ).subquery()
+            )
+        )
+        assert remaining == 0
 
 
 class TestComplexQueries:
     """Integration tests for complex queries with joins."""
     
-    def test_query_defects_by_project_and_status(self, db_session: Session, sample_project: Project,
-                                                  sample_defect_status: DefectStatus, sample_user: User):
-        """Test querying defects filtered by project and status."""
-        # Create multiple defects
-        defect1 = Defect(
-            project_id=sample_project.id,
-            title="Defect 1",
-            priority=PriorityEnum.HIGH,
-            status_id=sample_defect_status.id,
-            created_by=sample_user.id
-        )
-        defect2 = Defect(
-            project_id=sample_project.id,
-            title="Defect 2",
-            priority=PriorityEnum.MEDIUM,
-            status_id=sample_defect_status.id,
-            created_by=sample_user.id
-        )
-        db_session.add_all([defect1, defect2])
-        db_session.commit()
-        
-        # Query defects by project and status
-        defects = (
-            db_session.query(Defect)
-            .filter(
-                and_(
-                    Defect.project_id == sample_project.id,
-                    Defect.status_id == sample_defect_status.id
-                )
-            )
-            .all()
-        )
-        
-        assert len(defects) == 2
-        assert all(d.project_id == sample_project.id for d in defects)
-        assert all(d.status_id == sample_defect_status.id for d in defects)
-    
-    def test_query_defects_with_priority_filter(self, db_session: Session, sample_project: Project,
-                                                sample_defect_status: DefectStatus, sample_user: User):
-        """Test querying defects filtered by priority."""
-        # Create defects with different priorities
-        for priority in [PriorityEnum.LOW, PriorityEnum.MEDIUM, PriorityEnum.HIGH, PriorityEnum.CRITICAL]:
-            defect = Defect(
-                project_id=sample_project.id,
-                title=f"Defect {priority.value}",
-                priority=priority,
-                status_id=sample_defect_status.id,
-                created_by=sample_user.id
-            )
-            db_session.add(defect)
-        db_session.commit()
-        
-        # Query high and critical priority defects
-        high_priority_defects = (
-            db_session.query(Defect)
-            .filter(Defect.priority.in_([PriorityEnum.HIGH, PriorityEnum.CRITICAL]))
-            .all()
-        )
-        
-        assert len(high_priority_defects) == 2
-        assert all(d.priority in [PriorityEnum.HIGH, PriorityEnum.CRITICAL] for d in high_priority_defects)
-    
     def test_query_defects_with_creator_join(self, db_session: Session, sample_project: Project,
                                             sample_defect_status: DefectStatus, sample_user: User, sample_role: Role):
         """Test querying defects with join to creator user."""
@@ -333,15 +306,15 @@ class TestComplexQueries:
             created_by=sample_user.id
         )
         db_session.add(defect)
-        db_session.commit()
+        db_session.flush()
         
         # Query with join
-        result = (
-            db_session.query(Defect, User)
+        result = db_session.execute(
+            select(Defect, User)
             .join(User, Defect.created_by == User.id)
-            .filter(Defect.id == defect.id)
-            .first()
-        )
+            .options(raiseload("*"))
+            .where(Defect.id == defect.id)
+        ).first()
         
         assert result is not None
         queried_defect, creator = result
@@ -353,51 +326,58 @@ class TestComplexQueries:
                                             sample_defect_status: DefectStatus, sample_user: User):
         """Test querying projects with defect count aggregation."""
         # Create multiple defects for the project
-        for i in range(5):
-            defect = Defect(
+        db_session.execute(insert(Defect), [
+            dict(
                 project_id=sample_project.id,
                 title=f"Defect {i}",
                 priority=PriorityEnum.MEDIUM,
                 status_id=sample_defect_status.id,
                 created_by=sample_user.id
             )
-            db_session.add(defect)
-        db_session.commit()
+            for i in range(5)
+        ])
+        db_session.flush()
         
         # Query with count
-        result = (
-            db_session.query(Project, func.count(Defect.id).label("defect_count"))
+        result = db_session.execute(
+            select(Project, func.count(Defect.id).label("defect_count"))
             .outerjoin(Defect, Project.id == Defect.project_id)
-            .filter(Project.id == sample_project.id)
+            .where(Project.id == sample_project.id)
             .group_by(Project.id)
-            .first()
-        )
+        ).first()
         
         assert result is not None
         project, defect_count = result
         assert project.id == sample_project.id
         assert defect_count == 5
     
+    def test_defect_report_select_returns_rows(self, db_session: Session, sample_defect: Defect):
+        """Test the report export query yields Row tuples rather than ORM objects."""
+        rows = db_session.execute(defect_report_select(sample_defect.project_id)).all()
+        
+        assert len(rows) == 1
+        row = rows[0]
+        assert not isinstance(row, Defect)
+        assert row.id == sample_defect.id
+        assert row.priority == PriorityEnum.HIGH
+        assert row.status == "New"
+    
     def test_query_defects_with_comments_count(self, db_session: Session, sample_defect: Defect, sample_user: User):
         """Test querying defects with comment count."""
         # Add comments to defect
-        for i in range(3):
-            comment = Comment(
-                defect_id=sample_defect.id,
-                user_id=sample_user.id,
-                text=f"Comment {i}"
-            )
-            db_session.add(comment)
-        db_session.commit()
+        db_session.execute(insert(Comment), [
+            dict(defect_id=sample_defect.id, user_id=sample_user.id, text=f"Comment {i}")
+            for i in range(3)
+        ])
+        db_session.flush()
         
         # Query with comment count
-        result = (
-            db_session.query(Defect, func.count(Comment.id).label("comment_count"))
+        result = db_session.execute(
+            select(Defect, func.count(Comment.id).label("comment_count"))
             .outerjoin(Comment, Defect.id == Comment.defect_id)
-            .filter(Defect.id == sample_defect.id)
+            .where(Defect.id == sample_defect.id)
             .group_by(Defect.id)
-            .first()
-        )
+        ).first()
         
         assert result is not None
         defect, comment_count = result
@@ -405,11 +385,12 @@ class TestComplexQueries:
         assert comment_count == 3
     
     def test_query_users_with_assigned_defects(self, db_session: Session, sample_project: Project,
-                                               sample_defect_status: DefectStatus, sample_user: User):
+                                               sample_defect_status: DefectStatus, sample_user: User,
+                                               capture_queries):
         """Test querying users with their assigned defects."""
         # Create defects assigned to user
-        for i in range(2):
-            defect = Defect(
+        db_session.execute(insert(Defect), [
+            dict(
                 project_id=sample_project.id,
                 title=f"Assigned Defect {i}",
                 priority=PriorityEnum.HIGH,
@@ -417,60 +398,95 @@ class TestComplexQueries:
                 created_by=sample_user.id,
                 assigned_to=sample_user.id
             )
-            db_session.add(defect)
-        db_session.commit()
+            for i in range(2)
+        ])
+        db_session.flush()
         
         # Query user with assigned defects
-        user = (
-            db_session.query(User)
-            .options(selectinload(User.assigned_defects))
-            .filter_by(id=sample_user.id)
-            .first()
-        )
+        db_session.expunge_all()
+        with capture_queries() as statements:
+            user = db_session.scalars(
+                select(User)
+                .options(selectinload(User.assigned_defects), raiseload("*"))
+                .where(User.id == sample_user.id)
+            ).first()
+        assert len(statements) == 2
         
         assert user is not None
         assert len(user.assigned_defects) == 2
         assert all(d.assigned_to == sample_user.id for d in user.assigned_defects)
+
+
+@pytest.mark.usefixtures("seeded_defects")
+class TestSeededDefectQueries:
+    """Read-only defect queries sharing the class-scoped seeded_defects rows."""
     
-    def test_query_defects_ordered_by_priority_and_date(self, db_session: Session, sample_project: Project,
-                                                        sample_defect_status: DefectStatus, sample_user: User):
-        """Test querying defects with ordering."""
-        # Create defects with different priorities and dates
-        defects_data = [
-            ("Defect 1", PriorityEnum.LOW, date(2024, 6, 1)),
-            ("Defect 2", PriorityEnum.CRITICAL, date(2024, 5, 1)),
-            ("Defect 3", PriorityEnum.HIGH, date(2024, 4, 1)),
-        ]
+    def test_query_defects_by_project_and_status(self, db_session: Session, sample_project: Project,
+                                                  sample_defect_status: DefectStatus):
+        """Test querying defects filtered by project and status."""
+        defects = db_session.scalars(
+            DEFECTS_BY_PROJECT_AND_STATUS,
+            {"project_id": sample_project.id, "status_id": sample_defect_status.id}
+        ).all()
         
-        for title, priority, due_date in defects_data:
-            defect = Defect(
-                project_id=sample_project.id,
-                title=title,
-                priority=priority,
-                status_id=sample_defect_status.id,
-                created_by=sample_user.id,
-                due_date=due_date
-            )
-            db_session.add(defect)
-        db_session.commit()
+        assert len(defects) == len(SEEDED_DEFECTS)
+        assert all(d.project_id == sample_project.id for d in defects)
+        assert all(d.status_id == sample_defect_status.id for d in defects)
+    
+    @pytest.mark.parametrize("priorities,expected_count", [
+        ([PriorityEnum.HIGH, PriorityEnum.CRITICAL], 3),
+        ([PriorityEnum.MEDIUM], 1),
+        ([PriorityEnum.LOW], 2),
+        (list(PriorityEnum), 6),
+    ])
+    def test_query_defects_with_priority_filter(self, db_session: Session, priorities, expected_count):
+        """Test querying defects filtered by priority."""
+        defects = db_session.scalars(
+            select(Defect).where(Defect.priority.in_(priorities))
+        ).all()
         
-        # Query ordered by due date
-        defects = (
-            db_session.query(Defect)
-            .filter(Defect.project_id == sample_project.id)
+        assert len(defects) == expected_count
+        assert all(d.priority in priorities for d in defects)
+    
+    def test_query_defects_ordered_by_due_date(self, db_session: Session, sample_project: Project):
+        """Test querying defects ordered by due date."""
+        defects = db_session.scalars(
+            select(Defect)
+            .where(Defect.project_id == sample_project.id)
             .order_by(Defect.due_date)
-            .all()
-        )
+        ).all()
         
-        assert len(defects) == 3
-        assert defects[0].due_date == date(2024, 4, 1)
-        assert defects[1].due_date == date(2024, 5, 1)
-        assert defects[2].due_date == date(2024, 6, 1)
+        assert [d.due_date for d in defects] == sorted(due_date for _, _, due_date in SEEDED_DEFECTS)
+    
+    def test_query_defects_ordered_by_priority(self, db_session: Session, sample_project: Project):
+        """Test querying defects ordered by priority."""
+        # Priority is stored as ascending SMALLINT codes, so DESC is most severe first
+        defects = db_session.scalars(
+            select(Defect)
+            .where(Defect.project_id == sample_project.id)
+            .order_by(Defect.priority.desc())
+        ).all()
+        
+        assert [d.priority for d in defects] == [
+            PriorityEnum.CRITICAL, PriorityEnum.HIGH, PriorityEnum.HIGH,
+            PriorityEnum.MEDIUM, PriorityEnum.LOW, PriorityEnum.LOW
+        ]
 
 
 class TestTransactionRollback:
     """Integration tests for transaction rollbacks and error handling."""
     
+    def test_flush_keeps_transaction_open(self, db_session: Session):
+        """Test that flushed rows are visible but stay inside the open transaction."""
+        db_session.add(Role(name="Flushed", description="Flushed, never committed"))
+        db_session.flush()
+        
+        assert db_session.in_transaction()
+        assert db_session.query(Role).filter_by(name="Flushed").count() == 1
+        
+        db_session.rollback()
+        assert db_session.query(Role).filter_by(name="Flushed").count() == 0
+    
     def test_rollback_on_constraint_violation(self, db_session: Session, sample_role: Role):
         """Test that transaction rolls back on constraint violation."""
         # Create a user
@@ -573,7 +589,7 @@ class TestTransactionRollback:
         db_session.rollback()
         
         # Verify only first user exists
-        users = db_session.query(User).all()
+        users = db_session.query(User).filter_by(email="user1@example.com").all()
         assert len(users) == 1
         assert users[0].email == "user1@example.com"
 
@@ -593,7 +609,7 @@ class TestErrorHandling:
         db_session.add(user)
         
         with pytest.raises(IntegrityError):
-            db_session.commit()
+            db_session.flush()
         
         db_session.rollback()
     
@@ -610,14 +626,14 @@ class TestErrorHandling:
                 created_by=sample_user.id
             )
             db_session.add(defect)
-            db_session.commit()
+            db_session.flush()
         
         db_session.rollback()
     
     def test_query_nonexistent_record(self, db_session: Session):
         """Test querying for non-existent records."""
         # Query for non-existent user
-        user = db_session.query(User).filter_by(id=99999).first()
+        user = db_session.get(User, 99999)
         assert user is None
         
         # Query with filter that matches nothing
@@ -629,7 +645,7 @@ class TestErrorHandling:
         # Create and delete a user
         role = Role(name="Temp", description="Temp role")
         db_session.add(role)
-        db_session.commit()
+        db_session.flush()
         
         user = User(
             full_name="Temp User",
@@ -638,14 +654,15 @@ class TestErrorHandling:
             role_id=role.id
         )
         db_session.add(user)
-        db_session.commit()
+        db_session.flush()
         user_id = user.id
         
         db_session.delete(user)
-        db_session.commit()
+        db_session.flush()
         
         # Try to query and delete again
-        user_to_delete = db_session.query(User).filter_by(id=user_id).first()
+        db_session.expire_all()
+        user_to_delete = db_session.get(User, user_id)
         assert user_to_delete is None  # Already deleted
 
 
@@ -655,19 +672,19 @@ class TestBulkOperations:
     def test_bulk_insert_defects(self, db_session: Session, sample_project: Project,
                                 sample_defect_status: DefectStatus, sample_user: User):
         """Test bulk inserting multiple defects."""
-        defects = []
-        for i in range(10):
-            defect = Defect(
+        rows = [
+            dict(
                 project_id=sample_project.id,
                 title=f"Bulk Defect {i}",
                 priority=PriorityEnum.MEDIUM,
                 status_id=sample_defect_status.id,
                 created_by=sample_user.id
             )
-            defects.append(defect)
-        
-        db_session.add_all(defects)
-        db_session.commit()
+            for i in range(10)
+        ]
+        # Core table insert: no ORM bulk-insert bookkeeping at all
+        bulk_insert(db_session, Defect.__table__, rows)
+        db_session.flush()
         
         # Verify all defects were created
         created_defects = db_session.query(Defect).filter(Defect.title.like("Bulk Defect%")).all()
@@ -677,22 +694,23 @@ class TestBulkOperations:
                                 sample_defect_status: DefectStatus, sample_user: User):
         """Test bulk updating multiple defects."""
         # Create defects
-        for i in range(5):
-            defect = Defect(
+        bulk_insert(db_session, Defect, [
+            dict(
                 project_id=sample_project.id,
                 title=f"Update Defect {i}",
                 priority=PriorityEnum.LOW,
                 status_id=sample_defect_status.id,
                 created_by=sample_user.id
             )
-            db_session.add(defect)
-        db_session.commit()
+            for i in range(5)
+        ])
+        db_session.flush()
         
         # Bulk update priority
         db_session.query(Defect).filter(
             Defect.title.like("Update Defect%")
         ).update({"priority": PriorityEnum.HIGH})
-        db_session.commit()
+        db_session.flush()
         
         # Verify updates
         updated_defects = db_session.query(Defect).filter(Defect.title.like("Update Defect%")).all()
@@ -701,23 +719,124 @@ class TestBulkOperations:
     def test_bulk_delete_comments(self, db_session: Session, sample_defect: Defect, sample_user: User):
         """Test bulk deleting multiple comments."""
         # Create comments
-        for i in range(5):
-            comment = Comment(
-                defect_id=sample_defect.id,
-                user_id=sample_user.id,
-                text=f"Delete Comment {i}"
-            )
-            db_session.add(comment)
-        db_session.commit()
+        bulk_insert(db_session, Comment, [
+            dict(defect_id=sample_defect.id, user_id=sample_user.id, text=f"Delete Comment {i}")
+            for i in range(5)
+        ])
+        db_session.flush()
         
         # Bulk delete
         db_session.query(Comment).filter(
             Comment.text.like("Delete Comment%")
         ).delete()
-        db_session.commit()
+        db_session.flush()
         
         # Verify deletion
         remaining_comments = db_session.query(Comment).filter(
             Comment.text.like("Delete Comment%")
         ).all()
         assert len(remaining_comments) == 0
+    
+    def test_bulk_insert_spans_batches(self, db_session: Session, sample_defect: Defect, sample_user: User):
+        """Test that bulk_insert splits large row lists into several statements."""
+        rows = [
+            dict(defect_id=sample_defect.id, user_id=sample_user.id, text=f"Batch Comment {i}")
+            for i in range(25)
+        ]
+        bulk_insert(db_session, Comment, rows, batch_size=10)
+        db_session.flush()
+        
+        count = db_session.query(func.count(Comment.id)).filter(Comment.text.like("Batch Comment%")).scalar()
+        assert count == 25
+
+
+class TestReferenceCache:
+    """Integration tests for the reference-data cache and its invalidation."""
+    
+    def test_first_lookup_loads_and_second_is_cached(self, db_session: Session, reference_cache,
+                                                     sample_defect_status: DefectStatus, sample_role: Role,
+                                                     capture_queries):
+        """Test that each map is loaded with one SELECT and then served from memory."""
+        session = AsyncSessionAdapter(db_session)
+        
+        with capture_queries() as statements:
+            statuses = asyncio.run(cache.get_defect_statuses(session))
+            roles = asyncio.run(cache.get_roles(session))
+        assert len(statements) == 2
+        assert statuses == {sample_defect_status.id: "New"}
+        assert roles == {sample_role.id: "Engineer"}
+        
+        with capture_queries() as statements:
+            assert asyncio.run(cache.get_defect_statuses(session)) is statuses
+            assert asyncio.run(cache.get_roles(session)) is roles
+        assert statements == []
+    
+    def test_commit_of_reference_write_invalidates_cache(self, db_session: Session, reference_cache,
+                                                         capture_queries):
+        """Test that committing a DefectStatus makes the next lookup reload."""
+        session = AsyncSessionAdapter(db_session)
+        asyncio.run(cache.get_defect_statuses(session))
+        
+        db_session.add(DefectStatus(name="Reopened"))
+        db_session.commit()
+        
+        with capture_queries() as statements:
+            statuses = asyncio.run(cache.get_defect_statuses(session))
+        assert len(statements) == 1
+        assert "Reopened" in statuses.values()
+    
+    def test_rollback_keeps_cache(self, db_session: Session, reference_cache, capture_queries):
+        """Test that a rolled-back Role write leaves the cache intact."""
+        session = AsyncSessionAdapter(db_session)
+        roles = asyncio.run(cache.get_roles(session))
+        
+        db_session.add(Role(name="Inspector"))
+        db_session.flush()
+        db_session.rollback()
+        
+        with capture_queries() as statements:
+            assert asyncio.run(cache.get_roles(session)) is roles
+        assert statements == []
+    
+    def test_unrelated_commit_keeps_cache(self, db_session: Session, reference_cache, sample_user: User,
+                                          capture_queries):
+        """Test that commits not touching reference tables keep the cache."""
+        session = AsyncSessionAdapter(db_session)
+        roles = asyncio.run(cache.get_roles(session))
+        
+        sample_user.full_name = "Jane Doe"
+        db_session.commit()
+        
+        with capture_queries() as statements:
+            assert asyncio.run(cache.get_roles(session)) is roles
+        assert statements == []
+    
+    def test_invalidate_during_load_discards_result(self, db_session: Session, reference_cache,
+                                                    sample_role: Role, capture_queries):
+        """Test that a map loaded across an invalidate() is returned but not cached."""
+        session = AsyncSessionAdapter(db_session)
+        
+        async def invalidate():
+            cache.invalidate()
+        
+        async def load_and_invalidate():
+            # The load suspends inside execute(), where invalidate() runs
+            return await asyncio.gather(cache.get_roles(session), invalidate())
+        
+        roles, _ = asyncio.run(load_and_invalidate())
+        assert roles == {sample_role.id: "Engineer"}
+        
+        with capture_queries() as statements:
+            assert asyncio.run(cache.get_roles(session)) == roles
+        assert len(statements) == 1
+    
+    def test_expired_map_is_reloaded(self, db_session: Session, reference_cache, monkeypatch,
+                                     capture_queries):
+        """Test that a map older than CACHE_TTL is loaded again."""
+        session = AsyncSessionAdapter(db_session)
+        monkeypatch.setattr(cache, "CACHE_TTL", 0.0)
+        asyncio.run(cache.get_defect_statuses(session))
+        
+        with capture_queries() as statements:
+            asyncio.run(cache.get_defect_statuses(session))
+        assert len(statements) == 1
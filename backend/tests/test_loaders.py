@@ -0,0 +1,139 @@
+"""
+Tests for the batched per-defect count loaders.
+
+This module tests that CountLoader batches and de-duplicates ids, reports
+zero for defects without children, and never runs two statements on the
+same session at once.
+
+Requirements: 7.1-7.4, 8.1-8.5, 9.1-9.5
+"""
+
+import asyncio
+
+import pytest
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.loaders import CountLoader, attachment_counts, comment_counts, history_counts
+from app.models import Comment, Attachment, HistoryLog, Defect, User, ActionTypeEnum, PriorityEnum
+from tests._async import AsyncSessionAdapter
+
+
+@pytest.fixture(scope="function")
+def defects_with_children(db_session: Session, sample_defect: Defect, sample_user: User):
+    """Return (busy_id, empty_id): a defect with children and one without."""
+    empty_id = db_session.scalar(insert(Defect).returning(Defect.id), dict(
+        project_id=sample_defect.project_id,
+        title="Defect without children",
+        priority=PriorityEnum.LOW,
+        status_id=sample_defect.status_id,
+        created_by=sample_user.id
+    ))
+    db_session.execute(insert(Comment), [
+        dict(defect_id=sample_defect.id, user_id=sample_user.id, text=f"Comment {i}")
+        for i in range(3)
+    ])
+    db_session.execute(insert(Attachment), [
+        dict(
+            defect_id=sample_defect.id,
+            uploaded_by=sample_user.id,
+            file_name=f"photo_{i}.jpg",
+            file_path=f"/uploads/photo_{i}.jpg",
+            is_deleted=i == 1
+        )
+        for i in range(2)
+    ])
+    db_session.execute(insert(HistoryLog), dict(
+        defect_id=sample_defect.id,
+        user_id=sample_user.id,
+        action_type=ActionTypeEnum.CREATE,
+        new_value="Created"
+    ))
+    db_session.flush()
+    return sample_defect.id, empty_id
+
+
+class TestCountLoader:
+    """Tests for CountLoader batching."""
+    
+    def test_load_many_issues_one_query(self, db_session: Session, defects_with_children, capture_queries):
+        """Test that one batch of ids costs a single grouped SELECT."""
+        busy_id, empty_id = defects_with_children
+        loader = comment_counts(AsyncSessionAdapter(db_session))
+        
+        with capture_queries() as statements:
+            counts = asyncio.run(loader.load_many([busy_id, empty_id]))
+        
+        assert counts == [3, 0]
+        assert len(statements) == 1
+    
+    def test_concurrent_loads_are_batched_and_deduplicated(self, db_session: Session, defects_with_children,
+                                                           capture_queries):
+        """Test that separate load() calls in one loop iteration share a query and repeated ids one result."""
+        busy_id, empty_id = defects_with_children
+        loader = comment_counts(AsyncSessionAdapter(db_session))
+        
+        async def load_all():
+            return await asyncio.gather(
+                loader.load(busy_id),
+                loader.load(busy_id),
+                loader.load_many([empty_id, busy_id])
+            )
+        
+        with capture_queries() as statements:
+            results = asyncio.run(load_all())
+        
+        assert results == [3, 3, [0, 3]]
+        assert len(statements) == 1
+    
+    def test_loaded_counts_are_memoized(self, db_session: Session, defects_with_children, capture_queries):
+        """Test that ids loaded before, including zero counts, issue no further SQL."""
+        busy_id, empty_id = defects_with_children
+        loader = comment_counts(AsyncSessionAdapter(db_session))
+        asyncio.run(loader.load_many([busy_id, empty_id]))
+        
+        with capture_queries() as statements:
+            assert asyncio.run(loader.load_many([empty_id, busy_id])) == [0, 3]
+        assert statements == []
+    
+    def test_child_tables_and_criteria(self, db_session: Session, defects_with_children):
+        """Test the attachment (non-deleted only) and history loaders."""
+        busy_id, empty_id = defects_with_children
+        session = AsyncSessionAdapter(db_session)
+        
+        assert asyncio.run(attachment_counts(session).load_many([busy_id, empty_id])) == [1, 0]
+        assert asyncio.run(history_counts(session).load_many([busy_id, empty_id])) == [1, 0]
+    
+    def test_loaders_of_one_session_run_one_query_at_a_time(self, db_session: Session, defects_with_children,
+                                                            capture_queries):
+        """Test that gathering several loaders never overlaps execute() calls on the session."""
+        busy_id, empty_id = defects_with_children
+        session = AsyncSessionAdapter(db_session)
+        
+        async def load_all():
+            return await asyncio.gather(
+                comment_counts(session).load_many([busy_id, empty_id]),
+                attachment_counts(session).load_many([busy_id, empty_id]),
+                history_counts(session).load_many([busy_id, empty_id])
+            )
+        
+        with capture_queries() as statements:
+            results = asyncio.run(load_all())
+        
+        assert results == [[3, 0], [1, 0], [1, 0]]
+        assert len(statements) == 3
+        assert session.max_in_flight == 1
+    
+    def test_loader_is_cached_per_session(self, db_session: Session):
+        """Test that each session gets its own loader, reused on later calls."""
+        session = AsyncSessionAdapter(db_session)
+        other_session = AsyncSessionAdapter(db_session)
+        
+        assert isinstance(comment_counts(session), CountLoader)
+        assert comment_counts(session) is comment_counts(session)
+        assert comment_counts(session) is not comment_counts(other_session)
+    
+    def test_loader_without_session_outside_request(self):
+        """Test that using the request session outside a request raises a clear error."""
+        with pytest.raises(RuntimeError, match="No database session"):
+            comment_counts()
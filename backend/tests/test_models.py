@@ -9,14 +9,29 @@ Requirements: All model requirements
 
 import pytest
 from datetime import datetime, date, timezone
+from sqlalchemy import func, insert, select
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 
 from app.models import (
     Role, User, Project, ProjectStage, DefectStatus, Defect,
     Comment, Attachment, HistoryLog, Report, PriorityEnum, ActionTypeEnum
 )
 
+_PRIORITIES = tuple(PriorityEnum)
+_ACTION_TYPES = tuple(ActionTypeEnum)
+
+# Built once so the parametrized tests reuse the same cached statements
+_INSERTS = {
+    model: insert(model).returning(model.id)
+    for model in (Defect, HistoryLog, Report)
+}
+
+
+def _count(session: Session, model, **criteria) -> int:
+    """Count model rows matching criteria without loading them."""
+    return session.scalar(select(func.count()).select_from(model).filter_by(**criteria))
+
 
 class TestRoleModel:
     """Tests for the Role model."""
@@ -26,7 +41,6 @@ class TestRoleModel:
         role = Role(name="Manager", description="Manager role")
         db_session.add(role)
         db_session.commit()
-        db_session.refresh(role)
         
         assert role.id is not None
         assert role.name == "Manager"
@@ -35,10 +49,12 @@ class TestRoleModel:
     def test_role_unique_name_constraint(self, db_session: Session, sample_role: Role):
         """Test that role names must be unique."""
         duplicate_role = Role(name=sample_role.name, description="Duplicate")
-        db_session.add(duplicate_role)
         
+        # Only the SAVEPOINT is rolled back; the test's transaction stays usable
         with pytest.raises(IntegrityError):
-            db_session.commit()
+            with db_session.begin_nested():
+                db_session.add(duplicate_role)
+                db_session.flush()
     
     def test_role_relationship_with_users(self, db_session: Session, sample_role: Role, sample_user: User):
         """Test one-to-many relationship between Role and User."""
@@ -60,7 +76,6 @@ class TestUserModel:
         )
         db_session.add(user)
         db_session.commit()
-        db_session.refresh(user)
         
         assert user.id is not None
         assert user.full_name == "Jane Smith"
@@ -79,10 +94,11 @@ class TestUserModel:
             password_hash="password",
             role_id=sample_role.id
         )
-        db_session.add(duplicate_user)
         
         with pytest.raises(IntegrityError):
-            db_session.commit()
+            with db_session.begin_nested():
+                db_session.add(duplicate_user)
+                db_session.flush()
     
     def test_user_role_relationship(self, db_session: Session, sample_user: User, sample_role: Role):
         """Test many-to-one relationship between User and Role."""
@@ -104,7 +120,6 @@ class TestProjectModel:
         )
         db_session.add(project)
         db_session.commit()
-        db_session.refresh(project)
         
         assert project.id is not None
         assert project.name == "New Building"
@@ -128,7 +143,6 @@ class TestProjectModel:
         )
         db_session.add(stage)
         db_session.commit()
-        db_session.refresh(sample_project)
         
         assert len(sample_project.stages) == 1
         assert sample_project.stages[0].name == "Foundation"
@@ -148,7 +162,6 @@ class TestProjectStageModel:
         )
         db_session.add(stage)
         db_session.commit()
-        db_session.refresh(stage)
         
         assert stage.id is not None
         assert stage.project_id == sample_project.id
@@ -166,7 +179,6 @@ class TestProjectStageModel:
         )
         db_session.add(stage)
         db_session.commit()
-        db_session.refresh(stage)
         
         assert stage.project.id == sample_project.id
         assert stage.project.name == sample_project.name
@@ -187,7 +199,7 @@ class TestProjectStageModel:
         db_session.commit()
         
         # Verify stage is also deleted
-        deleted_stage = db_session.query(ProjectStage).filter_by(id=stage_id).first()
+        deleted_stage = db_session.get(ProjectStage, stage_id)
         assert deleted_stage is None
 
 
@@ -199,7 +211,6 @@ class TestDefectStatusModel:
         status = DefectStatus(name="In Progress", description="Work in progress")
         db_session.add(status)
         db_session.commit()
-        db_session.refresh(status)
         
         assert status.id is not None
         assert status.name == "In Progress"
@@ -208,10 +219,11 @@ class TestDefectStatusModel:
     def test_defect_status_unique_name_constraint(self, db_session: Session, sample_defect_status: DefectStatus):
         """Test that defect status names must be unique."""
         duplicate_status = DefectStatus(name=sample_defect_status.name, description="Duplicate")
-        db_session.add(duplicate_status)
         
         with pytest.raises(IntegrityError):
-            db_session.commit()
+            with db_session.begin_nested():
+                db_session.add(duplicate_status)
+                db_session.flush()
 
 
 class TestDefectModel:
@@ -232,7 +244,6 @@ class TestDefectModel:
         )
         db_session.add(defect)
         db_session.commit()
-        db_session.refresh(defect)
         
         assert defect.id is not None
         assert defect.project_id == sample_project.id
@@ -245,24 +256,36 @@ class TestDefectModel:
         assert defect.due_date == date(2024, 6, 30)
         assert defect.created_at is not None
     
+    @pytest.mark.parametrize("priority", _PRIORITIES)
     def test_defect_priority_enum(self, db_session: Session, sample_project: Project,
-                                  sample_defect_status: DefectStatus, sample_user: User):
+                                  sample_defect_status: DefectStatus, sample_user: User,
+                                  priority: PriorityEnum):
         """Test that defect priority uses PriorityEnum."""
-        for priority in [PriorityEnum.LOW, PriorityEnum.MEDIUM, PriorityEnum.HIGH, PriorityEnum.CRITICAL]:
-            defect = Defect(
-                project_id=sample_project.id,
-                title=f"Defect with {priority.value} priority",
-                priority=priority,
-                status_id=sample_defect_status.id,
-                created_by=sample_user.id
-            )
-            db_session.add(defect)
-            db_session.commit()
-            db_session.refresh(defect)
-            
-            assert defect.priority == priority
-            db_session.delete(defect)
-            db_session.commit()
+        defect_id = db_session.scalar(_INSERTS[Defect], dict(
+            project_id=sample_project.id,
+            title=f"Defect with {priority.value} priority",
+            priority=priority,
+            status_id=sample_defect_status.id,
+            created_by=sample_user.id
+        ))
+        
+        # Read the stored value back from the database
+        assert db_session.scalar(select(Defect.priority).where(Defect.id == defect_id)) == priority
+    
+    def test_priority_codes_round_trip(self):
+        """Test that SMALLINT codes map back to the declared members."""
+        column_type = Defect.__table__.c.priority.type
+        
+        assert [column_type.process_result_value(code, None) for code in range(1, 5)] == list(_PRIORITIES)
+        assert column_type.process_result_value(None, None) is None
+    
+    @pytest.mark.parametrize("code", [0, -1, len(_PRIORITIES) + 1])
+    def test_invalid_priority_code_raises(self, code: int):
+        """Test that codes outside 1..len(PriorityEnum) raise instead of wrapping around."""
+        column_type = Defect.__table__.c.priority.type
+        
+        with pytest.raises(ValueError, match="not a valid PriorityEnum code"):
+            column_type.process_result_value(code, None)
     
     def test_defect_relationships(self, db_session: Session, sample_defect: Defect,
                                  sample_project: Project, sample_defect_status: DefectStatus,
@@ -282,7 +305,6 @@ class TestDefectModel:
         )
         db_session.add(stage)
         db_session.commit()
-        db_session.refresh(stage)
         
         defect = Defect(
             project_id=sample_project.id,
@@ -294,7 +316,6 @@ class TestDefectModel:
         )
         db_session.add(defect)
         db_session.commit()
-        db_session.refresh(defect)
         
         assert defect.stage.id == stage.id
         assert defect.stage.name == "Foundation"
@@ -312,7 +333,6 @@ class TestCommentModel:
         )
         db_session.add(comment)
         db_session.commit()
-        db_session.refresh(comment)
         
         assert comment.id is not None
         assert comment.defect_id == sample_defect.id
@@ -329,7 +349,6 @@ class TestCommentModel:
         )
         db_session.add(comment)
         db_session.commit()
-        db_session.refresh(comment)
         
         assert comment.defect.id == sample_defect.id
         assert comment.user.id == sample_user.id
@@ -350,7 +369,7 @@ class TestCommentModel:
         db_session.commit()
         
         # Verify comment is also deleted
-        deleted_comment = db_session.query(Comment).filter_by(id=comment_id).first()
+        deleted_comment = db_session.get(Comment, comment_id)
         assert deleted_comment is None
 
 
@@ -368,7 +387,6 @@ class TestAttachmentModel:
         )
         db_session.add(attachment)
         db_session.commit()
-        db_session.refresh(attachment)
         
         assert attachment.id is not None
         assert attachment.defect_id == sample_defect.id
@@ -388,16 +406,15 @@ class TestAttachmentModel:
         )
         db_session.add(attachment)
         db_session.commit()
-        db_session.refresh(attachment)
         
         # Soft delete
         attachment.is_deleted = True
         db_session.commit()
-        db_session.refresh(attachment)
         
-        assert attachment.is_deleted is True
-        # Attachment still exists in database
-        assert db_session.query(Attachment).filter_by(id=attachment.id).first() is not None
+        # Attachment still exists in database, flagged as deleted
+        assert db_session.scalar(
+            select(Attachment.is_deleted).where(Attachment.id == attachment.id)
+        ) is True
     
     def test_attachment_relationships(self, db_session: Session, sample_defect: Defect, sample_user: User):
         """Test relationships between Attachment and other models."""
@@ -409,7 +426,6 @@ class TestAttachmentModel:
         )
         db_session.add(attachment)
         db_session.commit()
-        db_session.refresh(attachment)
         
         assert attachment.defect.id == sample_defect.id
         assert attachment.uploader.id == sample_user.id
@@ -431,7 +447,7 @@ class TestAttachmentModel:
         db_session.commit()
         
         # Verify attachment is also deleted
-        deleted_attachment = db_session.query(Attachment).filter_by(id=attachment_id).first()
+        deleted_attachment = db_session.get(Attachment, attachment_id)
         assert deleted_attachment is None
 
 
@@ -449,7 +465,6 @@ class TestHistoryLogModel:
         )
         db_session.add(history)
         db_session.commit()
-        db_session.refresh(history)
         
         assert history.id is not None
         assert history.defect_id == sample_defect.id
@@ -459,30 +474,44 @@ class TestHistoryLogModel:
         assert history.new_value == "Defect created"
         assert history.timestamp is not None
     
-    def test_history_log_action_types(self, db_session: Session, sample_defect: Defect, sample_user: User):
+    def test_history_log_status_change_ids(self, db_session: Session, sample_defect: Defect,
+                                           sample_defect_status: DefectStatus, sample_user: User):
+        """Test recording a status change by status id instead of text."""
+        in_progress = DefectStatus(name="In Progress")
+        db_session.add(in_progress)
+        db_session.commit()
+        
+        history = HistoryLog(
+            defect_id=sample_defect.id,
+            user_id=sample_user.id,
+            action_type=ActionTypeEnum.STATUS_CHANGE,
+            old_status_id=sample_defect_status.id,
+            new_status_id=in_progress.id
+        )
+        db_session.add(history)
+        db_session.commit()
+        
+        assert history.old_status_id == sample_defect_status.id
+        assert history.new_status_id == in_progress.id
+        assert history.old_value is None
+        assert history.new_value is None
+    
+    @pytest.mark.parametrize("action_type", _ACTION_TYPES)
+    def test_history_log_action_types(self, db_session: Session, sample_defect: Defect, sample_user: User,
+                                      action_type: ActionTypeEnum):
         """Test all action types for history log."""
-        action_types = [
-            ActionTypeEnum.CREATE,
-            ActionTypeEnum.UPDATE,
-            ActionTypeEnum.STATUS_CHANGE,
-            ActionTypeEnum.COMMENT_ADDED
-        ]
-        
-        for action_type in action_types:
-            history = HistoryLog(
-                defect_id=sample_defect.id,
-                user_id=sample_user.id,
-                action_type=action_type,
-                old_value="old",
-                new_value="new"
-            )
-            db_session.add(history)
-            db_session.commit()
-            db_session.refresh(history)
-            
-            assert history.action_type == action_type
-            db_session.delete(history)
-            db_session.commit()
+        history_id = db_session.scalar(_INSERTS[HistoryLog], dict(
+            defect_id=sample_defect.id,
+            user_id=sample_user.id,
+            action_type=action_type,
+            old_value="old",
+            new_value="new"
+        ))
+        
+        # Read the stored value back from the database
+        assert db_session.scalar(
+            select(HistoryLog.action_type).where(HistoryLog.id == history_id)
+        ) == action_type
     
     def test_history_log_relationships(self, db_session: Session, sample_defect: Defect, sample_user: User):
         """Test relationships between HistoryLog and other models."""
@@ -495,7 +524,6 @@ class TestHistoryLogModel:
         )
         db_session.add(history)
         db_session.commit()
-        db_session.refresh(history)
         
         assert history.defect.id == sample_defect.id
         assert history.user.id == sample_user.id
@@ -518,7 +546,7 @@ class TestHistoryLogModel:
         db_session.commit()
         
         # Verify history log is also deleted
-        deleted_history = db_session.query(HistoryLog).filter_by(id=history_id).first()
+        deleted_history = db_session.get(HistoryLog, history_id)
         assert deleted_history is None
 
 
@@ -535,7 +563,6 @@ class TestReportModel:
         )
         db_session.add(report)
         db_session.commit()
-        db_session.refresh(report)
         
         assert report.id is not None
         assert report.project_id == sample_project.id
@@ -554,137 +581,152 @@ class TestReportModel:
         )
         db_session.add(report)
         db_session.commit()
-        db_session.refresh(report)
         
         assert report.project.id == sample_project.id
         assert report.generator.id == sample_user.id
     
-    def test_multiple_report_types(self, db_session: Session, sample_project: Project, sample_user: User):
+    @pytest.mark.parametrize("report_type", ["by status", "by assignee", "by priority", "summary"])
+    def test_multiple_report_types(self, db_session: Session, sample_project: Project, sample_user: User,
+                                   report_type: str):
         """Test creating reports with different types."""
-        report_types = ["by status", "by assignee", "by priority", "summary"]
-        
-        for report_type in report_types:
-            report = Report(
-                project_id=sample_project.id,
-                report_type=report_type,
-                generated_by=sample_user.id,
-                file_path=f"/reports/{report_type.replace(' ', '_')}.csv"
-            )
-            db_session.add(report)
-            db_session.commit()
-            db_session.refresh(report)
-            
-            assert report.report_type == report_type
+        report_id = db_session.scalar(_INSERTS[Report], dict(
+            project_id=sample_project.id,
+            report_type=report_type,
+            generated_by=sample_user.id,
+            file_path=f"/reports/{report_type.replace(' ', '_')}.csv"
+        ))
+        
+        assert db_session.scalar(select(Report.report_type).where(Report.id == report_id)) == report_type
 
 
 class TestModelIntegration:
     """Integration tests for complex model interactions."""
     
-    def test_complete_defect_workflow(self, db_session: Session, sample_role: Role):
+    @pytest.mark.parametrize("fixture_name,attribute,value", [
+        ("sample_defect", "title", "Renamed defect"),
+        ("sample_user", "full_name", "Renamed User"),
+        ("sample_project", "name", "Renamed project"),
+    ])
+    def test_updated_at_fetched_on_update(self, db_session: Session, capture_queries, request,
+                                          fixture_name: str, attribute: str, value: str):
+        """Test that updated_at comes back with the UPDATE and reads without another SELECT."""
+        obj = request.getfixturevalue(fixture_name)
+        db_session.flush()
+        
+        with capture_queries() as statements:
+            setattr(obj, attribute, value)
+            db_session.flush()
+            updated_at = obj.updated_at
+        
+        assert updated_at is not None
+        assert len(statements) == 1
+        assert statements[0].startswith("UPDATE")
+    
+    def test_complete_defect_workflow(self, db_session: Session, sample_role: Role,
+                                      sample_defect_status: DefectStatus):
         """Test a complete workflow from user creation to defect with all related entities."""
+        # Rows are written with Core INSERT ... RETURNING, one statement per table;
+        # the ORM is only used to read them back
+        
         # Create users
-        manager = User(
-            full_name="Project Manager",
-            email="manager@example.com",
-            password_hash="hash1",
-            role_id=sample_role.id
-        )
-        engineer = User(
-            full_name="Engineer",
-            email="engineer@example.com",
-            password_hash="hash2",
-            role_id=sample_role.id
-        )
-        db_session.add_all([manager, engineer])
-        db_session.commit()
+        manager_id, engineer_id = db_session.scalars(
+            insert(User).returning(User.id, sort_by_parameter_order=True),
+            [
+                dict(
+                    full_name="Project Manager",
+                    email="manager@example.com",
+                    password_hash="hash1",
+                    role_id=sample_role.id
+                ),
+                dict(
+                    full_name="Engineer",
+                    email="engineer@example.com",
+                    password_hash="hash2",
+                    role_id=sample_role.id
+                ),
+            ]
+        ).all()
         
         # Create project
-        project = Project(
-            name="Building A",
-            description="Main building",
-            manager_id=manager.id
+        project_id = db_session.scalar(
+            insert(Project).returning(Project.id),
+            dict(name="Building A", description="Main building", manager_id=manager_id)
         )
-        db_session.add(project)
-        db_session.commit()
         
         # Create project stage
-        stage = ProjectStage(
-            project_id=project.id,
-            name="Foundation",
-            description="Foundation work"
+        stage_id = db_session.scalar(
+            insert(ProjectStage).returning(ProjectStage.id),
+            dict(project_id=project_id, name="Foundation", description="Foundation work")
         )
-        db_session.add(stage)
-        db_session.commit()
-        
-        # Create defect status
-        status = DefectStatus(name="New", description="New defect")
-        db_session.add(status)
-        db_session.commit()
         
-        # Create defect
-        defect = Defect(
-            project_id=project.id,
-            stage_id=stage.id,
-            title="Foundation crack",
-            description="Crack in foundation",
-            priority=PriorityEnum.CRITICAL,
-            status_id=status.id,
-            created_by=engineer.id,
-            assigned_to=engineer.id
+        # Create defect with the seeded "New" defect status
+        defect_id = db_session.scalar(
+            insert(Defect).returning(Defect.id),
+            dict(
+                project_id=project_id,
+                stage_id=stage_id,
+                title="Foundation crack",
+                description="Crack in foundation",
+                priority=PriorityEnum.CRITICAL,
+                status_id=sample_defect_status.id,
+                created_by=engineer_id,
+                assigned_to=engineer_id
+            )
         )
-        db_session.add(defect)
-        db_session.commit()
         
-        # Add comment
-        comment = Comment(
-            defect_id=defect.id,
-            user_id=manager.id,
-            text="Please fix urgently"
+        # Add comment, attachment and history log, and create a report
+        db_session.execute(
+            insert(Comment),
+            dict(defect_id=defect_id, user_id=manager_id, text="Please fix urgently")
         )
-        db_session.add(comment)
-        db_session.commit()
-        
-        # Add attachment
-        attachment = Attachment(
-            defect_id=defect.id,
-            uploaded_by=engineer.id,
-            file_name="crack_photo.jpg",
-            file_path="/uploads/crack_photo.jpg"
+        db_session.execute(
+            insert(Attachment),
+            dict(
+                defect_id=defect_id,
+                uploaded_by=engineer_id,
+                file_name="crack_photo.jpg",
+                file_path="/uploads/crack_photo.jpg"
+            )
         )
-        db_session.add(attachment)
-        db_session.commit()
-        
-        # Add history log
-        history = HistoryLog(
-            defect_id=defect.id,
-            user_id=engineer.id,
-            action_type=ActionTypeEnum.CREATE,
-            new_value="Defect created"
+        db_session.execute(
+            insert(HistoryLog),
+            dict(
+                defect_id=defect_id,
+                user_id=engineer_id,
+                action_type=ActionTypeEnum.CREATE,
+                new_value="Defect created"
+            )
         )
-        db_session.add(history)
-        db_session.commit()
-        
-        # Create report
-        report = Report(
-            project_id=project.id,
-            report_type="by status",
-            generated_by=manager.id,
-            file_path="/reports/status_report.csv"
+        db_session.execute(
+            insert(Report),
+            dict(
+                project_id=project_id,
+                report_type="by status",
+                generated_by=manager_id,
+                file_path="/reports/status_report.csv"
+            )
         )
-        db_session.add(report)
         db_session.commit()
         
-        # Verify all relationships
-        db_session.refresh(defect)
-        assert len(defect.comments) == 1
-        assert len(defect.attachments) == 1
-        assert len(defect.history_logs) == 1
+        # Verify all relationships (the many-to-ones are raise_on_sql, so opt in)
+        defect = db_session.scalars(
+            select(Defect)
+            .options(
+                selectinload(Defect.project),
+                selectinload(Defect.stage),
+                selectinload(Defect.creator),
+                selectinload(Defect.assignee)
+            )
+            .where(Defect.id == defect_id)
+        ).one()
+        assert _count(db_session, Comment, defect_id=defect_id) == 1
+        assert _count(db_session, Attachment, defect_id=defect_id) == 1
+        assert _count(db_session, HistoryLog, defect_id=defect_id) == 1
         assert defect.project.name == "Building A"
         assert defect.stage.name == "Foundation"
         assert defect.creator.email == "engineer@example.com"
         assert defect.assignee.email == "engineer@example.com"
         
-        db_session.refresh(project)
-        assert len(project.defects) == 1
-        assert len(project.stages) == 1
-        assert len(project.reports) == 1
+        assert _count(db_session, Defect, project_id=project_id) == 1
+        assert _count(db_session, ProjectStage, project_id=project_id) == 1
+        assert _count(db_session, Report, project_id=project_id) == 1
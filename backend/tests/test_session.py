@@ -0,0 +1,150 @@
+"""
+Tests for the per-request database session handle.
+
+This module tests that LazySession only creates an AsyncSession when the
+database is actually used, and that get_db() shares one handle per request
+through the current_db() ContextVar. No database connection is needed: the
+session factory is replaced with one that records the sessions it creates.
+
+Requirements: All requirements
+"""
+
+import asyncio
+
+import pytest
+
+from app import database
+from app.database import LazySession
+
+
+class FakeAsyncSession:
+    """Records close() calls in place of a real AsyncSession."""
+    
+    def __init__(self):
+        self.info = {}
+        self.closed = 0
+    
+    async def close(self) -> None:
+        self.closed += 1
+
+
+@pytest.fixture(scope="function")
+def created_sessions(monkeypatch):
+    """Replace SessionLocal and return the list of sessions it creates."""
+    sessions = []
+    
+    def session_factory():
+        session = FakeAsyncSession()
+        sessions.append(session)
+        return session
+    
+    monkeypatch.setattr(database, "SessionLocal", session_factory)
+    return sessions
+
+
+class TestLazySession:
+    """Tests for LazySession."""
+    
+    def test_untouched_session_is_never_created(self, created_sessions):
+        """Test that a handle nobody uses creates no session and close() is a no-op."""
+        db = LazySession()
+        asyncio.run(db.close())
+        
+        assert created_sessions == []
+    
+    def test_first_access_creates_one_session(self, created_sessions):
+        """Test that attribute access creates the session once and reuses it."""
+        db = LazySession()
+        
+        db.info["key"] = "value"
+        assert db.info == {"key": "value"}
+        assert db.session is created_sessions[0]
+        assert len(created_sessions) == 1
+    
+    def test_close_closes_created_session_once(self, created_sessions):
+        """Test that close() closes the created session and forgets it."""
+        db = LazySession()
+        db.info  # first access creates the session
+        
+        asyncio.run(db.close())
+        asyncio.run(db.close())
+        
+        assert len(created_sessions) == 1
+        assert created_sessions[0].closed == 1
+    
+    def test_async_context_manager(self, created_sessions):
+        """Test that async with closes the session on exit and stays lazy when unused."""
+        async def use(touch: bool):
+            async with LazySession() as db:
+                if touch:
+                    db.info  # first access creates the session
+        
+        asyncio.run(use(touch=False))
+        assert created_sessions == []
+        
+        asyncio.run(use(touch=True))
+        assert len(created_sessions) == 1
+        assert created_sessions[0].closed == 1
+
+
+async def _finish(dependency) -> None:
+    """Run a get_db() generator past its yield, as FastAPI does after the response."""
+    with pytest.raises(StopAsyncIteration):
+        await anext(dependency)
+
+
+class TestGetDb:
+    """Tests for get_db() and current_db()."""
+    
+    def test_current_db_outside_request(self):
+        """Test that there is no current handle outside get_db()."""
+        assert database.current_db() is None
+    
+    def test_get_db_sets_and_resets_current_db(self, created_sessions):
+        """Test that the yielded handle is current during the request only."""
+        async def request():
+            dependency = database.get_db()
+            db = await anext(dependency)
+            assert database.current_db() is db
+            db.info  # first access creates the session
+            
+            await _finish(dependency)
+            assert database.current_db() is None
+        
+        asyncio.run(request())
+        assert created_sessions[0].closed == 1
+    
+    def test_nested_get_db_reuses_outer_handle(self, created_sessions):
+        """Test that nested get_db() calls share the handle and only the outermost closes it."""
+        async def request():
+            outer = database.get_db()
+            db = await anext(outer)
+            db.info  # first access creates the session
+            
+            inner = database.get_db()
+            assert await anext(inner) is db
+            await _finish(inner)
+            
+            # The inner call neither closed the session nor reset the ContextVar
+            assert created_sessions[0].closed == 0
+            assert database.current_db() is db
+            
+            await _finish(outer)
+            assert created_sessions[0].closed == 1
+            assert database.current_db() is None
+        
+        asyncio.run(request())
+        assert len(created_sessions) == 1
+    
+    def test_get_db_closes_on_error(self, created_sessions):
+        """Test that the session is closed and the ContextVar reset when the handler raises."""
+        async def request():
+            dependency = database.get_db()
+            db = await anext(dependency)
+            db.info  # first access creates the session
+            with pytest.raises(RuntimeError):
+                await dependency.athrow(RuntimeError("handler failed"))
+            assert database.current_db() is None
+        
+        asyncio.run(request())
+        assert created_sessions[0].closed == 1